@@ -0,0 +1,24 @@
+"""add devices auth/revoked token hash indexes
+
+Revision ID: 9e4a7c2b1d30
+Revises: 4f9d3e1a0c21
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "9e4a7c2b1d30"
+down_revision = "4f9d3e1a0c21"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_devices_auth_token_hash", "devices", ["auth_token_hash"])
+    op.create_index("ix_devices_revoked_auth_token_hash", "devices", ["revoked_auth_token_hash"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_devices_revoked_auth_token_hash", table_name="devices")
+    op.drop_index("ix_devices_auth_token_hash", table_name="devices")
@@ -1,11 +1,12 @@
 import hashlib
 import hmac
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Generator, Optional
 
 from fastapi import Depends, Header, HTTPException, Request, status
-from sqlalchemy import or_, select
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from baseliner_server.core.config import settings
@@ -31,20 +32,84 @@ def utcnow() -> datetime:
     return datetime.now(timezone.utc)
 
 
+@lru_cache(maxsize=4)
+def _pepper_hasher(prefix: str) -> "hashlib._Hash":
+    """SHA-256 state with a pepper prefix already absorbed; callers must .copy() it.
+
+    Keyed by the prefix value so a reconfigured pepper is never served a stale state.
+    """
+
+    return hashlib.sha256(prefix.encode("utf-8"))
+
+
 def hash_token(token: str) -> str:
     """Deterministic token hash with a server-side pepper.
 
     We never store raw device/enroll tokens.
     """
 
-    msg = (settings.baseliner_token_pepper + token).encode("utf-8")
-    return hashlib.sha256(msg).hexdigest()
+    h = _pepper_hasher(settings.baseliner_token_pepper).copy()
+    h.update(token.encode("utf-8"))
+    return h.hexdigest()
 
 
 def verify_token(token: str, token_hash: str) -> bool:
     return hmac.compare_digest(hash_token(token), token_hash)
 
 
+def request_token_hash(request: Request, token: str) -> str:
+    """hash_token() for the request's bearer token, computed at most once per request.
+
+    Device requests resolve the token in several dependencies (rate limiting, tenant
+    resolution, device auth); they all share the cached hash via request.state.
+    """
+
+    state = getattr(request, "state", None)
+    cached = getattr(state, "bearer_token_hash", None)
+    if cached is not None and cached[0] == token:
+        return cached[1]
+
+    token_h = hash_token(token)
+    if state is not None:
+        state.bearer_token_hash = (token, token_h)
+    return token_h
+
+
+def resolve_bearer_token(
+    request: Request, db: Session, token: str
+) -> tuple[DeviceAuthToken | None, Device | None]:
+    """Look up a bearer token once per request, across all tenants.
+
+    Returns (token_row, None) when the token is in device_auth_tokens, else
+    (None, legacy_device) matched via devices.auth_token_hash / revoked_auth_token_hash,
+    else (None, None). The result is cached on request.state so rate limiting, tenant
+    resolution and device auth share one round trip. Nothing is cached across requests:
+    revocations must take effect immediately on every worker.
+    """
+
+    token_h = request_token_hash(request, token)
+    state = getattr(request, "state", None)
+    cached = getattr(state, "bearer_token_lookup", None)
+    # Only reuse rows loaded by this same Session (FastAPI shares get_db within a request).
+    if cached is not None and cached[0] == token_h and cached[1] is db:
+        return cached[2], cached[3]
+
+    tok = db.scalar(select(DeviceAuthToken).where(DeviceAuthToken.token_hash == token_h))
+    legacy_device: Device | None = None
+    if tok is None:
+        # Two single-column probes instead of OR-ing both columns, so each lookup can use its
+        # own index. The active hash is the common case; the revoked hash only runs on a miss.
+        legacy_device = db.scalar(select(Device).where(Device.auth_token_hash == token_h))
+        if legacy_device is None:
+            legacy_device = db.scalar(
+                select(Device).where(Device.revoked_auth_token_hash == token_h)
+            )
+
+    if state is not None:
+        state.bearer_token_lookup = (token_h, db, tok, legacy_device)
+    return tok, legacy_device
+
+
 def hash_admin_key(admin_key: str) -> str:
     """Hash an admin key for audit logging.
 
@@ -52,8 +117,9 @@ def hash_admin_key(admin_key: str) -> str:
     cannot collide with token hashes.
     """
 
-    msg = (settings.baseliner_token_pepper + "admin:" + admin_key).encode("utf-8")
-    return hashlib.sha256(msg).hexdigest()
+    h = _pepper_hasher(settings.baseliner_token_pepper + "admin:").copy()
+    h.update(admin_key.encode("utf-8"))
+    return h.hexdigest()
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -146,21 +212,11 @@ def get_scoped_session(
     # Device bearer tokens have the highest priority: they deterministically pick a tenant.
     if authorization and authorization.lower().startswith("bearer "):
         token = authorization.split(" ", 1)[1].strip()
-        token_h = hash_token(token)
-        tok = db.scalar(select(DeviceAuthToken).where(DeviceAuthToken.token_hash == token_h))
+        tok, dev = resolve_bearer_token(request, db, token)
         if tok is not None:
             tenant_id = getattr(tok, "tenant_id", None)
-        else:
-            dev = db.scalar(
-                select(Device).where(
-                    or_(
-                        Device.auth_token_hash == token_h,
-                        Device.revoked_auth_token_hash == token_h,
-                    )
-                )
-            )
-            if dev is not None:
-                tenant_id = getattr(dev, "tenant_id", None) or DEFAULT_TENANT_ID
+        elif dev is not None:
+            tenant_id = getattr(dev, "tenant_id", None) or DEFAULT_TENANT_ID
 
     # Explicit tenant header next (superadmin use case).
     if tenant_id is None and x_tenant_id:
@@ -287,6 +343,19 @@ def require_admin_actor(admin_key: AdminKey = Depends(get_admin_key)) -> str:
     return getattr(admin_key, "key_hash", None) or hash_admin_key(settings.baseliner_admin_key)
 
 
+def _last_seen_is_recent(last_seen_at: datetime | None, now: datetime) -> bool:
+    """True if last_seen_at was written less than the configured interval ago."""
+
+    interval = settings.device_last_seen_write_interval_seconds
+    if interval <= 0 or last_seen_at is None:
+        return False
+    seen = last_seen_at
+    if seen.tzinfo is None:
+        # sqlite hands back naive datetimes; they are stored as UTC.
+        seen = seen.replace(tzinfo=timezone.utc)
+    return timedelta(0) <= now - seen < timedelta(seconds=interval)
+
+
 def get_current_device(
     request: Request,
     db: TenantScopedSession = Depends(get_scoped_session),
@@ -300,23 +369,23 @@ def get_current_device(
     fields if no token-row exists yet.
     """
 
-    token_h = hash_token(token)
+    token_h = request_token_hash(request, token)
+
+    # Usually already resolved by get_scoped_session for this request. The lookup is not
+    # tenant-scoped, so drop matches outside the session's tenant.
+    tok, legacy_device = resolve_bearer_token(request, db.db, token)
+    if tok is not None and tok.tenant_id != db.tenant.id:
+        tok = None
+    if legacy_device is not None and legacy_device.tenant_id != db.tenant.id:
+        legacy_device = None
 
-    tok = db.scalar(select(DeviceAuthToken).where(DeviceAuthToken.token_hash == token_h))
     device: Device | None = tok.device if tok is not None else None
 
     if device is None:
         # Legacy fallback: map to device by current/most-recently revoked hash so we can return a
         # clear 403 instead of a generic 401. If we find a match and no token row exists, we may
         # lazily create a token-history row (active path only).
-        device = db.scalar(
-            select(Device).where(
-                or_(
-                    Device.auth_token_hash == token_h,
-                    Device.revoked_auth_token_hash == token_h,
-                )
-            )
-        )
+        device = legacy_device
         if not device:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid device token"
@@ -346,7 +415,9 @@ def get_current_device(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Device token revoked")
 
     now = utcnow()
-    device.last_seen_at = now
+    if not _last_seen_is_recent(device.last_seen_at, now):
+        device.last_seen_at = now
+        db.add(device)
 
     # Token usage signal: update only for device report posts (to keep this "meaningful").
     try:
@@ -360,7 +431,8 @@ def get_current_device(
     except Exception:
         pass
 
-    db.add(device)
-    db.commit()
+    # Skip the commit entirely for polls that changed nothing.
+    if db.new or db.dirty:
+        db.commit()
 
     return device
@@ -37,6 +37,7 @@ from baseliner_server.db.models import (
     PolicyAssignment,
     Run,
     RunItem,
+    RunKind,
     Tenant,
 )
 from baseliner_server.services.device_tokens import rotate_device_token, revoke_device_tokens
@@ -127,6 +128,13 @@ def _compute_enroll_token_expires_at(payload: CreateEnrollTokenRequest) -> datet
     return utcnow() + timedelta(seconds=ttl)
 
 
+def _contains_pattern(value: str) -> str:
+    """LIKE pattern matching `value` as a literal substring (use with escape="\\")."""
+
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
 def _status(v: Any) -> Optional[str]:
     if v is None:
         return None
@@ -1473,8 +1481,13 @@ def list_policies(
 
     qv = (q or "").strip()
     if qv:
-        like = f"%{qv}%"
-        stmt = stmt.where(or_(Policy.name.ilike(like), Policy.description.ilike(like)))
+        like = _contains_pattern(qv)
+        stmt = stmt.where(
+            or_(
+                Policy.name.ilike(like, escape="\\"),
+                Policy.description.ilike(like, escape="\\"),
+            )
+        )
 
     total = db.scalar(select(func.count()).select_from(stmt.subquery())) or 0
 
@@ -1706,12 +1719,18 @@ def list_devices(
         False,
         description="If true, include soft-deleted devices in the list.",
     ),
+    q: str | None = Query(
+        None,
+        description="Substring search on device_key/hostname (case-insensitive).",
+    ),
 ) -> DevicesListResponse:
     from baseliner_server.schemas.admin_list import DeviceHealth, RunSummaryLite
 
     # We track both:
     #   - last_any_run: latest run of any kind (for general visibility)
     #   - last_apply_run: latest apply run (for health computation)
+    # Both are ranked with ROW_NUMBER() in a single statement (no per-device
+    # queries); the apply ranking is served by ix_runs_device_id_kind_started_at.
     runs_any_ranked = (
         select(
             Run.id.label("run_id"),
@@ -1746,12 +1765,23 @@ def list_devices(
             .label("apply_rn"),
         )
         .where(Run.tenant_id == tenant.id)
+        .where(Run.kind == RunKind.apply)
     ).subquery()
 
     stmt = select(Device, runs_any_ranked, runs_apply_ranked).where(Device.tenant_id == tenant.id)
     if not include_deleted:
         stmt = stmt.where(Device.status != DeviceStatus.deleted)
 
+    qv = (q or "").strip()
+    if qv:
+        like = _contains_pattern(qv)
+        stmt = stmt.where(
+            or_(
+                Device.device_key.ilike(like, escape="\\"),
+                Device.hostname.ilike(like, escape="\\"),
+            )
+        )
+
     stmt = (
         stmt.outerjoin(
             runs_any_ranked,
@@ -2,7 +2,7 @@ import secrets
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
 from baseliner_server.api.deps import get_db, hash_token
@@ -79,6 +79,18 @@ def enroll(
 
     now = utcnow()
 
+    # Claim the token atomically before doing any device work. The row lock above is
+    # best-effort (ignored by sqlite); the conditional UPDATE makes single-use hold even when
+    # two enrollments race on the same token: only one of them can flip used_at.
+    claimed = scoped_db.execute(
+        update(EnrollToken)
+        .where(EnrollToken.id == enroll_token.id, EnrollToken.used_at.is_(None))
+        .values(used_at=now)
+    )
+    if claimed.rowcount != 1:
+        scoped_db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Enroll token already used")
+
     if device is None:
         # Mint a fresh device token on first enrollment.
         device_token = secrets.token_urlsafe(32)
@@ -131,8 +143,7 @@ def enroll(
         device.last_seen_at = now
         scoped_db.add(device)
 
-    # Mark token used.
-    enroll_token.used_at = now
+    # The conditional UPDATE above already set used_at; only record who used the token.
     enroll_token.used_by_device_id = device.id
     scoped_db.add(enroll_token)
 
@@ -25,5 +25,9 @@ class Settings(BaseSettings):
     rate_limit_reports_ip_per_minute: int = 60
     rate_limit_reports_ip_burst: int = 10
 
+    # Device auth bumps devices.last_seen_at at most this often (seconds), so frequent polls
+    # don't each cost an UPDATE + COMMIT. 0 writes on every authenticated request.
+    device_last_seen_write_interval_seconds: int = 30
+
 
 settings = Settings()
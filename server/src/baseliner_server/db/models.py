@@ -195,6 +195,8 @@ class Device(Base):
         Index("ix_devices_last_seen_at", "last_seen_at"),
         Index("ix_devices_status", "status"),
         Index("ix_devices_token_revoked_at", "token_revoked_at"),
+        Index("ix_devices_auth_token_hash", "auth_token_hash"),
+        Index("ix_devices_revoked_auth_token_hash", "revoked_auth_token_hash"),
     )
 
 
@@ -6,12 +6,10 @@ from dataclasses import dataclass
 from typing import Optional
 
 from fastapi import Depends, Header, HTTPException, Request
-from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
 from starlette.status import HTTP_429_TOO_MANY_REQUESTS
 
-from baseliner_server.api.deps import get_db, hash_token
-from baseliner_server.db.models import Device, DeviceAuthToken
+from baseliner_server.api.deps import get_db, resolve_bearer_token
 
 
 @dataclass(frozen=True)
@@ -56,40 +54,54 @@ class _TokenBucket:
 class InMemoryRateLimiter:
     """In-memory token bucket store.
 
+    Buckets are guarded by a small set of striped locks keyed by the bucket key, so requests
+    for different devices/IPs do not serialize on one global lock. Requests for the same key
+    still share a lock: refill + consume must be atomic or concurrent requests over-admit.
+
     NOTE: This does not share state across processes/containers.
     """
 
-    def __init__(self, *, max_entries: int = 50_000, stale_after_seconds: int = 3600):
-        self._lock = threading.Lock()
+    def __init__(
+        self,
+        *,
+        max_entries: int = 50_000,
+        stale_after_seconds: int = 3600,
+        lock_stripes: int = 16,
+    ):
+        self._locks = tuple(threading.Lock() for _ in range(max(1, int(lock_stripes))))
+        self._prune_lock = threading.Lock()
         self._buckets: dict[str, _TokenBucket] = {}
-        self._last_seen: dict[str, float] = {}
         self._max_entries = int(max_entries)
         self._stale_after = int(stale_after_seconds)
+        self._trim_chunk = max(1, min(512, self._max_entries // 20))
 
     def reset(self) -> None:
-        with self._lock:
+        with self._prune_lock:
             self._buckets.clear()
-            self._last_seen.clear()
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        return self._locks[hash(key) % len(self._locks)]
 
     def _prune(self, *, now: float) -> None:
-        # Cheap opportunistic pruning.
+        # Cheap opportunistic pruning; only one thread sweeps at a time.
         if len(self._buckets) <= self._max_entries:
             return
-
-        cutoff = now - float(self._stale_after)
-        stale_keys = [k for k, ts in self._last_seen.items() if ts < cutoff]
-        for k in stale_keys:
-            self._buckets.pop(k, None)
-            self._last_seen.pop(k, None)
-
-        # Still too large? Drop oldest.
-        if len(self._buckets) <= self._max_entries:
+        if not self._prune_lock.acquire(blocking=False):
             return
-        for k, _ts in sorted(self._last_seen.items(), key=lambda kv: kv[1])[
-            : max(0, len(self._buckets) - self._max_entries)
-        ]:
-            self._buckets.pop(k, None)
-            self._last_seen.pop(k, None)
+        try:
+            # Snapshot first: other threads may insert buckets while we sweep.
+            by_age = sorted(self._buckets.items(), key=lambda kv: kv[1].last_ts)
+            cutoff = now - float(self._stale_after)
+            # Trim a chunk below the cap, not just back to it, so a flood of new keys (e.g.
+            # rotating IPs) does not re-sort the whole store on every request.
+            excess = len(by_age) - self._max_entries + self._trim_chunk
+            for i, (k, b) in enumerate(by_age):
+                # Drop stale buckets, then the oldest ones if we are still too large.
+                if b.last_ts >= cutoff and i >= excess:
+                    break
+                self._buckets.pop(k, None)
+        finally:
+            self._prune_lock.release()
 
     def consume(
         self,
@@ -109,16 +121,15 @@ class InMemoryRateLimiter:
         rpm = max(1, int(per_minute))
         refill_rate = float(rpm) / 60.0
 
-        with self._lock:
+        with self._lock_for(key):
             b = self._buckets.get(key)
             if b is None:
                 b = _TokenBucket(capacity=float(cap), refill_rate=refill_rate, now=n)
                 self._buckets[key] = b
-
-            self._last_seen[key] = n
             allowed, retry_after = b.consume(now=n, amount=1.0)
-            self._prune(now=n)
-            return allowed, retry_after
+
+        self._prune(now=n)
+        return allowed, retry_after
 
 
 def _client_ip(request: Request) -> str:
@@ -130,27 +141,16 @@ def _client_ip(request: Request) -> str:
     return "unknown"
 
 
-def _try_get_device_id(db: Session, token: str) -> str | None:
-    token_h = hash_token(token)
-
-    # Prefer token history table (includes revoked tokens, so we can still bucket requests
-    # by device for throttling even if the request will later be rejected).
-    device_id = db.scalar(
-        select(DeviceAuthToken.device_id).where(DeviceAuthToken.token_hash == token_h)
-    )
-    if device_id:
-        return str(device_id)
-
-    # Legacy fallback (pre-migration/test DBs).
-    device_id = db.scalar(
-        select(Device.id).where(
-            or_(
-                Device.auth_token_hash == token_h,
-                Device.revoked_auth_token_hash == token_h,
-            )
-        )
-    )
-    return str(device_id) if device_id else None
+def _try_get_device_id(request: Request, db: Session, token: str) -> str | None:
+    # Token history rows include revoked tokens, so we can still bucket requests by device
+    # for throttling even if the request will later be rejected. The lookup is shared with
+    # the auth dependencies for the rest of the request.
+    tok, legacy_device = resolve_bearer_token(request, db, token)
+    if tok is not None:
+        return str(tok.device_id)
+    if legacy_device is not None:
+        return str(legacy_device.id)
+    return None
 
 
 def _get_config(request: Request) -> RateLimitConfig:
@@ -195,7 +195,7 @@ def enforce_device_reports_rate_limit(
     device_id = None
     if token:
         try:
-            device_id = _try_get_device_id(db, token)
+            device_id = _try_get_device_id(request, db, token)
         except Exception:
             device_id = None
 
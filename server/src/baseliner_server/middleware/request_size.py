@@ -22,6 +22,15 @@ class RequestEntityTooLarge(Exception):
         self.received = received
 
 
+def _content_length_header(scope: Scope) -> bytes | None:
+    # ASGI servers pass header names lowercased, so scan for the one header we need instead of
+    # building a dict of all of them on every request.
+    for name, value in scope.get("headers") or ():
+        if name == b"content-length":
+            return value
+    return None
+
+
 class RequestSizeLimitMiddleware:
     """ASGI middleware that rejects requests whose body exceeds a configured limit.
 
@@ -60,8 +69,7 @@ class RequestSizeLimitMiddleware:
             return
 
         # Fast-path: reject early if Content-Length is present and too big.
-        headers = {k.lower(): v for (k, v) in (scope.get("headers") or [])}
-        raw_len = headers.get(b"content-length")
+        raw_len = _content_length_header(scope)
         if raw_len:
             try:
                 content_length = int(raw_len.decode("ascii", errors="ignore").strip() or "0")
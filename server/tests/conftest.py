@@ -1,100 +1,147 @@
 from __future__ import annotations
 
-import os
+import json
 import sys
-import tempfile
+from datetime import datetime, timezone
+from functools import cache
 from pathlib import Path
-from typing import Generator
+from typing import Callable, Generator
 
 import pytest
+from fastapi.testclient import TestClient
+from httpx import Response
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
 
 # Ensure we import the in-repo baseliner_server package rather than any nested clones.
 _SERVER_SRC = Path(__file__).resolve().parents[1] / "src"
 if str(_SERVER_SRC) not in sys.path:
     sys.path.insert(0, str(_SERVER_SRC))
 
-from baseliner_server.api.deps import get_db, hash_admin_key
+from baseliner_server.api.deps import get_db, hash_admin_key, hash_token
 from baseliner_server.core.config import settings
 from baseliner_server.core.tenancy import DEFAULT_TENANT_ID, ensure_default_tenant
 from baseliner_server.db.base import Base
-from baseliner_server.db.models import AdminKey, AdminScope
+from baseliner_server.db.models import AdminKey, AdminScope, Device, DeviceStatus
 from baseliner_server.main import app
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine, select
-from sqlalchemy.orm import Session, sessionmaker
 
+# One report timestamp per session; the server does not key anything off started_at.
+_REPORT_STARTED_AT = datetime.now(timezone.utc).isoformat()
+# The empty report never changes, so encode it once and post the bytes.
+_EMPTY_REPORT_BODY = json.dumps(
+    {"started_at": _REPORT_STARTED_AT, "status": "succeeded", "items": [], "summary": {}}
+).encode()
 
-@pytest.fixture()
+
+@pytest.fixture(scope="session")
 def db_engine():
     """
-    Temp sqlite DB per test. Keeps tests isolated + avoids cross-thread Session sharing.
-    """
-    fd, path = tempfile.mkstemp(prefix="baseliner_test_", suffix=".db")
-    os.close(fd)
+    One in-memory sqlite DB for the whole session; the schema is built exactly once.
 
+    StaticPool pins the single connection so every Session (test + request handlers) sees the
+    same database. Per-test isolation comes from the outer transaction in `db_connection`.
+
+    The DB lives in-process, so under pytest-xdist (`pytest -n auto`) every worker gets its own
+    database with no shared files or locking between workers.
+    """
     engine = create_engine(
-        f"sqlite:///{path}",
+        "sqlite+pysqlite:///:memory:",
         connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
         future=True,
     )
+
+    # pysqlite's implicit transaction handling breaks SAVEPOINT; let SQLAlchemy emit BEGIN.
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn, _record):
+        dbapi_conn.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
     Base.metadata.create_all(bind=engine)
 
     try:
         yield engine
     finally:
         engine.dispose()
-        try:
-            Path(path).unlink(missing_ok=True)
-        except Exception:
-            pass
 
 
-@pytest.fixture()
-def db(db_engine) -> Generator[Session, None, None]:
-    SessionLocal = sessionmaker(bind=db_engine, autoflush=False, autocommit=False, future=True)
-    s = SessionLocal()
-    try:
-        ensure_default_tenant(s)
-        if not s.scalar(select(AdminKey).where(AdminKey.tenant_id == DEFAULT_TENANT_ID)):
-            s.add(
-                AdminKey(
-                    tenant_id=DEFAULT_TENANT_ID,
-                    key_hash=hash_admin_key(settings.baseliner_admin_key),
-                    scope=AdminScope.superadmin,
-                )
+def _session_factory(conn: Connection) -> sessionmaker:
+    return sessionmaker(
+        bind=conn,
+        autoflush=False,
+        autocommit=False,
+        future=True,
+        join_transaction_mode="create_savepoint",
+    )
+
+
+def _seed_defaults(s: Session) -> None:
+    ensure_default_tenant(s)
+    if not s.scalar(select(AdminKey).where(AdminKey.tenant_id == DEFAULT_TENANT_ID)):
+        s.add(
+            AdminKey(
+                tenant_id=DEFAULT_TENANT_ID,
+                key_hash=hash_admin_key(settings.baseliner_admin_key),
+                scope=AdminScope.superadmin,
             )
-            s.flush()
-        yield s
+        )
         s.commit()
-    except Exception:
-        s.rollback()
-        raise
-    finally:
-        s.close()
 
 
 @pytest.fixture()
-def client(db_engine) -> Generator[TestClient, None, None]:
+def db_connection(db_engine) -> Generator[Connection, None, None]:
     """
-    TestClient fixture (generator): overrides deps and clears overrides after test.
+    Outer transaction per test; everything a test writes is rolled back on teardown.
+
+    Sessions bind with join_transaction_mode="create_savepoint", so `commit()` inside tests or
+    request handlers only releases a SAVEPOINT and never ends the outer transaction.
     """
-    SessionLocal = sessionmaker(bind=db_engine, autoflush=False, autocommit=False, future=True)
+    conn = db_engine.connect()
+    trans = conn.begin()
 
-    seed_session = SessionLocal()
+    seed_session = _session_factory(conn)()
     try:
-        ensure_default_tenant(seed_session)
-        if not seed_session.scalar(select(AdminKey).where(AdminKey.tenant_id == DEFAULT_TENANT_ID)):
-            seed_session.add(
-                AdminKey(
-                    tenant_id=DEFAULT_TENANT_ID,
-                    key_hash=hash_admin_key(settings.baseliner_admin_key),
-                    scope=AdminScope.superadmin,
-                )
-            )
-            seed_session.commit()
+        _seed_defaults(seed_session)
     finally:
         seed_session.close()
 
+    try:
+        yield conn
+    finally:
+        trans.rollback()
+        conn.close()
+
+
+@pytest.fixture()
+def db(db_connection) -> Generator[Session, None, None]:
+    s = _session_factory(db_connection)()
+    try:
+        yield s
+    finally:
+        # No commit: the outer transaction in `db_connection` is rolled back regardless.
+        s.close()
+
+
+@pytest.fixture(scope="session")
+def _shared_client() -> TestClient:
+    """
+    One TestClient (and transport) for the whole session; `client` swaps the DB per test.
+    """
+    return TestClient(app, headers={"X-Admin-Key": settings.baseliner_admin_key})
+
+
+@pytest.fixture()
+def client(_shared_client, db_connection) -> Generator[TestClient, None, None]:
+    """
+    TestClient fixture (generator): overrides deps and clears overrides after test.
+    """
+    SessionLocal = _session_factory(db_connection)
+
     def _get_db_override():
         s = SessionLocal()
         try:
@@ -102,17 +149,73 @@ def client(db_engine) -> Generator[TestClient, None, None]:
             yield s
         finally:
             s.close()
+
     app.dependency_overrides[get_db] = _get_db_override
 
     try:
-        default_headers = {
-            "X-Admin-Key": settings.baseliner_admin_key,
-        }
-        yield TestClient(app, headers=default_headers)
+        yield _shared_client
     finally:
         app.dependency_overrides.clear()
+        _shared_client.cookies.clear()
 
 
 @pytest.fixture()
 def admin_headers():
     return {"X-Admin-Key": settings.baseliner_admin_key, "X-Tenant-ID": str(DEFAULT_TENANT_ID)}
+
+
+@cache
+def _token_hash(token: str) -> str:
+    # Tests reuse a handful of literal tokens; the pepper is fixed for the session.
+    return hash_token(token)
+
+
+@pytest.fixture()
+def make_device(db):
+    """
+    Factory for an active device flushed into the test session.
+
+    `token` is the raw device token (stored hashed); any Device column can be overridden.
+    """
+
+    def _make(*, device_key: str, token: str = "tok", **overrides) -> Device:
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        fields = {
+            "device_key": device_key,
+            "hostname": f"host-{device_key}",
+            "os": "windows",
+            "os_version": "10.0",
+            "arch": "x64",
+            "agent_version": "0.1.0-dev",
+            "tags": {"env": "test"},
+            "enrolled_at": now,
+            "last_seen_at": now,
+            "auth_token_hash": _token_hash(token),
+            "status": DeviceStatus.active,
+        }
+        fields.update(overrides)
+        d = Device(**fields)
+        db.add(d)
+        db.flush()
+        return d
+
+    return _make
+
+
+@pytest.fixture()
+def report_started_at() -> str:
+    return _REPORT_STARTED_AT
+
+
+@pytest.fixture()
+def post_empty_report(client) -> Callable[[str], Response]:
+    """POST an empty succeeded report with device `token`; returns the raw response."""
+
+    def _post(token: str) -> Response:
+        return client.post(
+            "/api/v1/device/reports",
+            headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
+            content=_EMPTY_REPORT_BODY,
+        )
+
+    return _post
@@ -3,7 +3,6 @@ from __future__ import annotations
 from datetime import datetime, timezone
 
 from fastapi.testclient import TestClient
-from sqlalchemy import select
 
 from baseliner_server.api.deps import hash_admin_key, hash_token
 from baseliner_server.core.config import settings
@@ -71,7 +70,7 @@ def test_audit_logs_device_delete_includes_reason(client: TestClient, db):
 
     # Confirm device is deleted at DB layer too
     db.expire_all()
-    d2 = db.scalar(select(Device).where(Device.id == dev.id))
+    d2 = db.get(Device, dev.id)
     assert d2 is not None
     assert d2.status == DeviceStatus.deleted
 
@@ -72,7 +72,7 @@ def test_tenant_admin_deactivate_blocks_device(client: TestClient, db) -> None:
     assert "deactivated" in blocked.text.lower()
 
     db.expire_all()
-    d_row = db.scalar(select(Device).where(Device.id == uuid.UUID(device["device_id"])))
+    d_row = db.get(Device, uuid.UUID(device["device_id"]))
     assert d_row is not None
     assert d_row.status == DeviceStatus.deactivated
 
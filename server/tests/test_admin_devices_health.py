@@ -1,9 +1,16 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
+from functools import cache
+from typing import TYPE_CHECKING
 
-import httpx
-from baseliner_server.db.models import Device, Run, RunStatus
+import pytest
+from baseliner_server.db.models import Device, Run, RunKind, RunStatus
+
+if TYPE_CHECKING:  # pragma: no cover
+    import httpx
+
+HEALTH_THRESHOLDS = {"stale_after_seconds": 1800, "offline_after_seconds": 3600}
 
 
 def utcnow() -> datetime:
@@ -17,16 +24,23 @@ def _admin_devices_path(client) -> str:
     This prevents tests from hardcoding /api/v1 when the router
     may be mounted at / (or mounted with a different prefix).
     """
-    for r in getattr(client.app, "routes", []):
+    return _find_route_path(client.app, "/admin/devices")
+
+
+@cache
+def _find_route_path(app, suffix: str) -> str:
+    # The route table is fixed once the app is built, so walk it once per app.
+    for r in getattr(app, "routes", []):
         path = getattr(r, "path", None)
-        if isinstance(path, str) and path.endswith("/admin/devices"):
+        if isinstance(path, str) and path.endswith(suffix):
             return path
-    raise AssertionError("admin/devices route not registered on the app")
+    raise AssertionError(f"{suffix.lstrip('/')} route not registered on the app")
 
 
-def _get_devices(client, qs: str) -> httpx.Response:
+def _get_devices(client, *, include_health: bool) -> httpx.Response:
     path = _admin_devices_path(client)
-    return client.get(f"{path}{qs}")
+    params = {"include_health": include_health, **HEALTH_THRESHOLDS}
+    return client.get(path, params=params)
 
 
 def _create_device(db, *, device_key: str, last_seen_at: datetime | None) -> Device:
@@ -54,9 +68,11 @@ def _create_run(
     started_at: datetime,
     ended_at: datetime | None,
     status: RunStatus,
+    kind: RunKind = RunKind.apply,
 ) -> Run:
     r = Run(
         device_id=device_id,
+        kind=kind,
         started_at=started_at,
         ended_at=ended_at,
         effective_policy_hash="deadbeef",
@@ -70,185 +86,141 @@ def _create_run(
     return r
 
 
-def _get_device(resp_json: dict, device_key: str) -> dict:
-    return next(x for x in resp_json["items"] if x["device_key"] == device_key)
-
-
-def test_health_ok(client, db):
-    """
-    last_seen recent, latest run succeeded and not stale => ok
-    """
-    dev = _create_device(db, device_key="OK1", last_seen_at=utcnow() - timedelta(seconds=10))
-    end = utcnow() - timedelta(seconds=30)
-    _create_run(
-        db,
-        device_id=dev.id,
-        started_at=end - timedelta(seconds=20),
-        ended_at=end,
-        status=RunStatus.succeeded,
+def _by_key(resp_json: dict) -> dict[str, dict]:
+    return {x["device_key"]: x for x in resp_json["items"]}
+
+
+@pytest.fixture()
+def seed_health_device(db):
+    """
+    Seed a device whose last check-in and latest run are given as ages in seconds.
+
+    Ages are turned into timestamps at call time, right before the request, so the
+    offsets the endpoint sees match the table rows as closely as possible.
+    """
+
+    def _seed(
+        device_key: str,
+        *,
+        seen_age_s: int,
+        run_age_s: int | None = None,
+        run_status: RunStatus = RunStatus.succeeded,
+    ) -> tuple[Device, Run | None]:
+        now = utcnow()
+        dev = _create_device(
+            db, device_key=device_key, last_seen_at=now - timedelta(seconds=seen_age_s)
+        )
+        run = None
+        if run_age_s is not None:
+            end = now - timedelta(seconds=run_age_s)
+            run = _create_run(
+                db,
+                device_id=dev.id,
+                started_at=end - timedelta(seconds=20),
+                ended_at=end,
+                status=run_status,
+            )
+        return dev, run
+
+    return _seed
+
+
+@pytest.mark.parametrize(
+    ("device_key", "seen_age_s", "run_age_s", "run_status", "expected"),
+    [
+        # last_seen recent, latest run succeeded and not stale => ok
+        ("OK1", 10, 30, RunStatus.succeeded, ("ok", False, False, None)),
+        # last_seen recent, but no runs exist => stale => warn
+        ("STL0", 10, None, RunStatus.succeeded, ("warn", False, True, "stale")),
+        # last_seen recent, latest run older than stale_after_seconds => warn stale
+        ("STL1", 10, 4000, RunStatus.succeeded, ("warn", False, True, "stale")),
+        # last_seen too old => offline
+        ("OFF1", 999999, 30, RunStatus.succeeded, ("offline", True, False, "checked in")),
+        # last_seen recent, latest apply run failed => warn
+        ("FLD1", 10, 30, RunStatus.failed, ("warn", False, False, "apply run failed")),
+    ],
+)
+def test_health_status(
+    client, db, seed_health_device, device_key, seen_age_s, run_age_s, run_status, expected
+):
+    status, offline, stale, reason = expected
+    _, run = seed_health_device(
+        device_key, seen_age_s=seen_age_s, run_age_s=run_age_s, run_status=run_status
     )
     db.commit()
 
-    r = _get_devices(
-        client,
-        "?include_health=true&stale_after_seconds=1800&offline_after_seconds=3600",
-    )
+    r = _get_devices(client, include_health=True)
     assert r.status_code == 200
-    d = _get_device(r.json(), "OK1")
-
-    assert d["health"]["status"] == "ok"
-    assert d["health"]["offline"] is False
-    assert d["health"]["stale"] is False
-    assert d["last_run"] is not None
-    assert (d["last_run"]["status"] or "").lower() == "succeeded"
+    d = _by_key(r.json())[device_key]
 
+    assert d["health"]["status"] == status
+    assert d["health"]["offline"] is offline
+    assert d["health"]["stale"] is stale
+    if reason is None:
+        assert d["health"].get("reason") is None
+    else:
+        assert reason in (d["health"].get("reason") or "").lower()
 
-def test_health_warn_stale_no_runs(client, db):
-    """
-    last_seen recent, but no runs exist => stale True => warn
-    """
-    _create_device(db, device_key="STL0", last_seen_at=utcnow() - timedelta(seconds=10))
-    db.commit()
+    if run is None:
+        assert d.get("last_run") is None
+    else:
+        assert d["last_run"]["id"] == str(run.id)
+        assert (d["last_run"]["status"] or "").lower() == run_status.value
 
-    r = _get_devices(
-        client,
-        "?include_health=true&stale_after_seconds=1800&offline_after_seconds=3600",
-    )
-    assert r.status_code == 200
-    d = _get_device(r.json(), "STL0")
 
-    assert d.get("last_run") is None
-    assert d["health"]["status"] == "warn"
-    assert d["health"]["offline"] is False
-    assert d["health"]["stale"] is True
-    assert "stale" in (d["health"].get("reason") or "").lower()
-
-
-def test_health_warn_stale_old_run(client, db):
+def test_last_run_and_health_present_without_flag(client, db, seed_health_device):
     """
-    last_seen recent, but latest run is older than stale_after_seconds => warn stale
+    last_run + basic health data should be returned even when include_health=false.
     """
-    dev = _create_device(db, device_key="STL1", last_seen_at=utcnow() - timedelta(seconds=10))
-    old_end = utcnow() - timedelta(seconds=4000)
-    _create_run(
-        db,
-        device_id=dev.id,
-        started_at=old_end - timedelta(seconds=30),
-        ended_at=old_end,
-        status=RunStatus.succeeded,
-    )
+    _, run = seed_health_device("LITE1", seen_age_s=120, run_age_s=60)
     db.commit()
 
-    r = _get_devices(
-        client,
-        "?include_health=true&stale_after_seconds=1800&offline_after_seconds=3600",
-    )
+    r = _get_devices(client, include_health=False)
     assert r.status_code == 200
-    d = _get_device(r.json(), "STL1")
+    d = _by_key(r.json())["LITE1"]
 
-    assert d["health"]["status"] == "warn"
+    assert d["last_run"]["id"] == str(run.id)
+    assert d["health"]["status"] == "ok"
     assert d["health"]["offline"] is False
-    assert d["health"]["stale"] is True
 
 
-def test_health_offline(client, db):
-    """
-    last_seen too old => offline
+def test_health_without_runs_even_when_flag_disabled(client, db, seed_health_device):
     """
-    dev = _create_device(db, device_key="OFF1", last_seen_at=utcnow() - timedelta(seconds=999999))
-    end = utcnow() - timedelta(seconds=30)
-    _create_run(
-        db,
-        device_id=dev.id,
-        started_at=end - timedelta(seconds=20),
-        ended_at=end,
-        status=RunStatus.succeeded,
-    )
-    db.commit()
-
-    r = _get_devices(
-        client,
-        "?include_health=true&stale_after_seconds=1800&offline_after_seconds=3600",
-    )
-    assert r.status_code == 200
-    d = _get_device(r.json(), "OFF1")
-
-    assert d["health"]["status"] == "offline"
-    assert d["health"]["offline"] is True
-    assert "checked in" in (d["health"].get("reason") or "").lower()
-
-
-def test_health_warn_failed_run(client, db):
-    """
-    last_seen recent, latest run failed => warn "latest run failed"
+    Devices without runs still report health metadata with the default flag.
     """
-    dev = _create_device(db, device_key="FLD1", last_seen_at=utcnow() - timedelta(seconds=10))
-    end = utcnow() - timedelta(seconds=30)
-    _create_run(
-        db,
-        device_id=dev.id,
-        started_at=end - timedelta(seconds=20),
-        ended_at=end,
-        status=RunStatus.failed,
-    )
+    seed_health_device("NORN", seen_age_s=10)
     db.commit()
 
-    r = _get_devices(
-        client,
-        "?include_health=true&stale_after_seconds=1800&offline_after_seconds=3600",
-    )
+    r = _get_devices(client, include_health=False)
     assert r.status_code == 200
-    d = _get_device(r.json(), "FLD1")
+    d = _by_key(r.json())["NORN"]
 
+    assert d.get("last_run") is None
     assert d["health"]["status"] == "warn"
-    assert d["health"]["offline"] is False
-    assert "apply" in (d["health"].get("reason") or "").lower()
-    assert "failed" in (d["health"].get("reason") or "").lower()
+    assert d["health"]["stale"] is True
 
 
-def test_last_run_and_health_present_without_flag(client, db):
+def test_health_uses_latest_apply_run_not_heartbeat(client, db, seed_health_device):
     """
-    last_run + basic health data should be returned even when include_health=false.
+    A newer heartbeat shows up as last_run, but health follows the latest apply run.
     """
-
-    dev = _create_device(db, device_key="LITE1", last_seen_at=utcnow() - timedelta(seconds=120))
-    end = utcnow() - timedelta(seconds=60)
-    run = _create_run(
+    dev, _ = seed_health_device("HB1", seen_age_s=10, run_age_s=4000)
+    hb_end = utcnow() - timedelta(seconds=20)
+    heartbeat = _create_run(
         db,
         device_id=dev.id,
-        started_at=end - timedelta(seconds=20),
-        ended_at=end,
+        started_at=hb_end - timedelta(seconds=1),
+        ended_at=hb_end,
         status=RunStatus.succeeded,
+        kind=RunKind.heartbeat,
     )
     db.commit()
 
-    r = _get_devices(
-        client,
-        "?include_health=false&stale_after_seconds=1800&offline_after_seconds=3600",
-    )
+    r = _get_devices(client, include_health=True)
     assert r.status_code == 200
-    d = _get_device(r.json(), "LITE1")
-
-    assert d["last_run"]["id"] == str(run.id)
-    assert d["health"]["status"] == "ok"
-    assert d["health"]["offline"] is False
-
+    d = _by_key(r.json())["HB1"]
 
-def test_health_without_runs_even_when_flag_disabled(client, db):
-    """
-    Devices without runs still report health metadata with the default flag.
-    """
-
-    _create_device(db, device_key="NORN", last_seen_at=utcnow() - timedelta(seconds=10))
-    db.commit()
-
-    r = _get_devices(
-        client,
-        "?include_health=false&stale_after_seconds=1800&offline_after_seconds=3600",
-    )
-    assert r.status_code == 200
-    d = _get_device(r.json(), "NORN")
-
-    assert d.get("last_run") is None
-    assert d["health"]["status"] == "warn"
+    assert d["last_run"]["id"] == str(heartbeat.id)
+    assert d["health"]["last_run_kind"] == "apply"
     assert d["health"]["stale"] is True
+    assert d["health"]["status"] == "warn"
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import pytest
+
+DEVICE_KEYS = ["LAPTOP-ALPHA", "DESKTOP-BETA", "WEB_01", "WEBX01", "CPU%50", "CPU150"]
+
+
+@pytest.mark.parametrize(
+    ("q", "expected"),
+    [
+        ("laptop", ["LAPTOP-ALPHA"]),
+        # hostname is "host-<device_key>", so this only matches via hostname.
+        ("host-desktop", ["DESKTOP-BETA"]),
+        # `_` and `%` in q are literal characters, not LIKE wildcards.
+        ("web_01", ["WEB_01"]),
+        ("u%5", ["CPU%50"]),
+    ],
+)
+def test_list_devices_q_filters_on_device_key_and_hostname(client, db, make_device, q, expected):
+    for key in DEVICE_KEYS:
+        make_device(device_key=key)
+    db.commit()
+
+    r = client.get("/api/v1/admin/devices", params={"q": q})
+    assert r.status_code == 200, r.text
+    assert [d["device_key"] for d in r.json()["items"]] == expected
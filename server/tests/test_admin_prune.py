@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import uuid
 from datetime import datetime, timedelta, timezone
 
 from baseliner_server.db.models import (
@@ -12,20 +11,18 @@ from baseliner_server.db.models import (
     RunStatus,
     StepStatus,
 )
-from sqlalchemy import select
+from sqlalchemy import func, select
 
-
-def _utc_naive(dt: datetime) -> datetime:
-    # The app uses naive datetimes in a few admin endpoints for sqlite test friendliness.
-    if dt.tzinfo is None:
-        return dt
-    return dt.astimezone(timezone.utc).replace(tzinfo=None)
+PRUNE_PATH = "/api/v1/admin/maintenance/prune"
+DRY_RUN_BODY = {"keep_days": 30, "keep_runs_per_device": 100, "dry_run": True, "batch_size": 50}
+EXECUTE_BODY = {**DRY_RUN_BODY, "dry_run": False}
 
 
 def test_admin_prune_runs_dry_run_and_delete(client, db):
     # Arrange: one device with three runs; two are older than 30 days.
+    # The app uses naive UTC datetimes in a few admin endpoints for sqlite test friendliness.
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
     dev = Device(
-        id=uuid.uuid4(),
         device_key="TEST-PRUNE-001",
         hostname="t",
         os="windows",
@@ -33,19 +30,17 @@ def test_admin_prune_runs_dry_run_and_delete(client, db):
         arch="x64",
         agent_version="0.1.0-dev",
         tags={},
-        enrolled_at=_utc_naive(datetime.now(timezone.utc)),
-        last_seen_at=_utc_naive(datetime.now(timezone.utc)),
+        enrolled_at=now,
+        last_seen_at=now,
         auth_token_hash="x",
     )
     db.add(dev)
     db.commit()
 
-    now = datetime.now(timezone.utc)
     r_recent = Run(
-        id=uuid.uuid4(),
         device_id=dev.id,
-        started_at=_utc_naive(now - timedelta(minutes=5)),
-        ended_at=_utc_naive(now - timedelta(minutes=4)),
+        started_at=now - timedelta(minutes=5),
+        ended_at=now - timedelta(minutes=4),
         status=RunStatus.succeeded,
         agent_version="0.1.0-dev",
         effective_policy_hash="h",
@@ -54,10 +49,9 @@ def test_admin_prune_runs_dry_run_and_delete(client, db):
     )
 
     r_old1 = Run(
-        id=uuid.uuid4(),
         device_id=dev.id,
-        started_at=_utc_naive(now - timedelta(days=40)),
-        ended_at=_utc_naive(now - timedelta(days=40, minutes=-1)),
+        started_at=now - timedelta(days=40),
+        ended_at=now - timedelta(days=40) + timedelta(minutes=1),
         status=RunStatus.succeeded,
         agent_version="0.1.0-dev",
         effective_policy_hash="h",
@@ -66,10 +60,9 @@ def test_admin_prune_runs_dry_run_and_delete(client, db):
     )
 
     r_old2 = Run(
-        id=uuid.uuid4(),
         device_id=dev.id,
-        started_at=_utc_naive(now - timedelta(days=35)),
-        ended_at=_utc_naive(now - timedelta(days=35, minutes=-1)),
+        started_at=now - timedelta(days=35),
+        ended_at=now - timedelta(days=35) + timedelta(minutes=1),
         status=RunStatus.failed,
         agent_version="0.1.0-dev",
         effective_policy_hash="h",
@@ -82,7 +75,6 @@ def test_admin_prune_runs_dry_run_and_delete(client, db):
 
     for r in [r_recent, r_old1, r_old2]:
         item = RunItem(
-            id=uuid.uuid4(),
             run_id=r.id,
             resource_type="script.powershell",
             resource_id="x",
@@ -104,7 +96,6 @@ def test_admin_prune_runs_dry_run_and_delete(client, db):
         db.flush()
 
         log = LogEvent(
-            id=uuid.uuid4(),
             run_id=r.id,
             run_item_id=item.id,
             ts=r.ended_at,
@@ -117,10 +108,7 @@ def test_admin_prune_runs_dry_run_and_delete(client, db):
     db.commit()
 
     # Dry-run
-    resp = client.post(
-        "/api/v1/admin/maintenance/prune",
-        json={"keep_days": 30, "keep_runs_per_device": 100, "dry_run": True, "batch_size": 50},
-    )
+    resp = client.post(PRUNE_PATH, json=DRY_RUN_BODY)
     assert resp.status_code == 200
     body = resp.json()
 
@@ -131,15 +119,15 @@ def test_admin_prune_runs_dry_run_and_delete(client, db):
     assert body["counts"]["log_events"] == 2
 
     # Execute delete
-    resp2 = client.post(
-        "/api/v1/admin/maintenance/prune",
-        json={"keep_days": 30, "keep_runs_per_device": 100, "dry_run": False, "batch_size": 50},
-    )
+    resp2 = client.post(PRUNE_PATH, json=EXECUTE_BODY)
     assert resp2.status_code == 200
     body2 = resp2.json()
     assert body2["dry_run"] is False
     assert body2["counts"]["runs"] == 2
 
-    remaining = list(db.scalars(select(Run).where(Run.device_id == dev.id)).all())
-    assert len(remaining) == 1
-    assert str(remaining[0].id) == str(r_recent.id)
+    remaining_q = select(Run.id).where(Run.device_id == dev.id)
+    remaining_count = db.execute(
+        select(func.count()).select_from(remaining_q.subquery())
+    ).scalar_one()
+    assert remaining_count == 1
+    assert str(db.execute(remaining_q).scalar_one()) == str(r_recent.id)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
+from itertools import pairwise
 
 from baseliner_server.db.models import Device, Run, RunStatus
 
@@ -71,7 +72,7 @@ def test_runs_total_and_pagination(client, db):
     db.commit()
 
     # Page 1
-    r1 = client.get("/api/v1/admin/runs?limit=5&offset=0")
+    r1 = client.get("/api/v1/admin/runs", params={"limit": 5, "offset": 0})
     assert r1.status_code == 200
     j1 = r1.json()
 
@@ -80,9 +81,9 @@ def test_runs_total_and_pagination(client, db):
     assert j1["offset"] == 0
     assert len(j1["items"]) == 5
 
-    # Confirm ordering: started_at is descending
+    # Confirm ordering: started_at is strictly descending (runs are a minute apart)
     started = [it["started_at"] for it in j1["items"]]
-    assert started == sorted(started, reverse=True)
+    assert all(a > b for a, b in pairwise(started))
 
     # Status is serialized as string, not enum object
     for it in j1["items"]:
@@ -91,7 +92,7 @@ def test_runs_total_and_pagination(client, db):
             assert it["status"] in {"succeeded", "failed", "running", "partial"}
 
     # Page 2 (offset)
-    r2 = client.get("/api/v1/admin/runs?limit=5&offset=5")
+    r2 = client.get("/api/v1/admin/runs", params={"limit": 5, "offset": 5})
     assert r2.status_code == 200
     j2 = r2.json()
 
@@ -101,7 +102,7 @@ def test_runs_total_and_pagination(client, db):
     assert len(j2["items"]) == 5
 
     # Page 3 (last page)
-    r3 = client.get("/api/v1/admin/runs?limit=5&offset=10")
+    r3 = client.get("/api/v1/admin/runs", params={"limit": 5, "offset": 10})
     assert r3.status_code == 200
     j3 = r3.json()
 
@@ -144,7 +145,9 @@ def test_runs_device_id_filter(client, db):
     db.commit()
 
     # Filter d1
-    r1 = client.get(f"/api/v1/admin/runs?device_id={d1.id}&limit=50&offset=0")
+    r1 = client.get(
+        "/api/v1/admin/runs", params={"device_id": str(d1.id), "limit": 50, "offset": 0}
+    )
     assert r1.status_code == 200
     j1 = r1.json()
     assert j1["total"] == 3
@@ -152,7 +155,9 @@ def test_runs_device_id_filter(client, db):
     assert all(it["device_id"] == str(d1.id) for it in j1["items"])
 
     # Filter d2
-    r2 = client.get(f"/api/v1/admin/runs?device_id={d2.id}&limit=50&offset=0")
+    r2 = client.get(
+        "/api/v1/admin/runs", params={"device_id": str(d2.id), "limit": 50, "offset": 0}
+    )
     assert r2.status_code == 200
     j2 = r2.json()
     assert j2["total"] == 7
@@ -170,7 +175,7 @@ def test_runs_status_field_is_stable_string(client, db):
     _create_run(db, device_id=d.id, started_at=st, ended_at=None, status=RunStatus.running)
     db.commit()
 
-    r = client.get("/api/v1/admin/runs?limit=10&offset=0")
+    r = client.get("/api/v1/admin/runs", params={"limit": 10, "offset": 0})
     assert r.status_code == 200
     j = r.json()
 
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from baseliner_server.db.models import Device
+
+
+def _naive_utc(dt: datetime) -> datetime:
+    return dt.astimezone(timezone.utc).replace(tzinfo=None) if dt.tzinfo else dt
+
+
+def _poll(client, token: str) -> None:
+    r = client.get("/api/v1/device/policy", headers={"Authorization": f"Bearer {token}"})
+    assert r.status_code == 200, r.text
+
+
+def test_recent_last_seen_is_not_rewritten(client, db, make_device):
+    seen = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=5)
+    dev = make_device(device_key="SEEN-RECENT", token="tok-seen-recent", last_seen_at=seen)
+    db.commit()
+
+    _poll(client, "tok-seen-recent")
+
+    db.expire_all()
+    assert _naive_utc(db.get(Device, dev.id).last_seen_at) == seen
+
+
+def test_stale_last_seen_is_bumped(client, db, make_device):
+    seen = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(minutes=10)
+    dev = make_device(device_key="SEEN-STALE", token="tok-seen-stale", last_seen_at=seen)
+    db.commit()
+
+    _poll(client, "tok-seen-stale")
+
+    db.expire_all()
+    assert _naive_utc(db.get(Device, dev.id).last_seen_at) > seen + timedelta(minutes=9)
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
+from functools import cache
 
-from baseliner_server.api.deps import hash_token
 from baseliner_server.db.models import (
     AssignmentMode,
     Device,
@@ -11,15 +11,16 @@ from baseliner_server.db.models import (
     PolicyAssignment,
 )
 from fastapi.testclient import TestClient
-from sqlalchemy import select
 
 
 def _utcnow() -> datetime:
     return datetime.now(timezone.utc).replace(tzinfo=None)
 
 
-def _find_route_path(client: TestClient, *, suffix: str, method: str) -> str:
-    for r in getattr(client.app, "routes", []):
+@cache
+def _find_route_path(app, *, suffix: str, method: str) -> str:
+    # The route table is fixed once the app is built, so walk it once per app.
+    for r in getattr(app, "routes", []):
         path = getattr(r, "path", None)
         methods = getattr(r, "methods", None)
         if (
@@ -33,31 +34,11 @@ def _find_route_path(client: TestClient, *, suffix: str, method: str) -> str:
 
 
 def _admin_delete_device_path(client: TestClient) -> str:
-    return _find_route_path(client, suffix="/admin/devices/{device_id}", method="DELETE")
+    return _find_route_path(client.app, suffix="/admin/devices/{device_id}", method="DELETE")
 
 
 def _admin_list_devices_path(client: TestClient) -> str:
-    return _find_route_path(client, suffix="/admin/devices", method="GET")
-
-
-def _create_device(db, *, device_key: str, token: str) -> Device:
-    now = _utcnow()
-    d = Device(
-        device_key=device_key,
-        hostname="host-" + device_key,
-        os="windows",
-        os_version="10.0",
-        arch="x64",
-        agent_version="0.1.0-dev",
-        tags={"env": "test"},
-        enrolled_at=now,
-        last_seen_at=now,
-        auth_token_hash=hash_token(token),
-        status=DeviceStatus.active,
-    )
-    db.add(d)
-    db.flush()
-    return d
+    return _find_route_path(client.app, suffix="/admin/devices", method="GET")
 
 
 def _create_policy(db, *, name: str = "p1") -> Policy:
@@ -89,23 +70,11 @@ def _assign_policy(db, *, device_id, policy_id) -> PolicyAssignment:
     return a
 
 
-def _post_empty_report(client: TestClient, token: str):
-    payload = {
-        "started_at": datetime.now(timezone.utc).isoformat(),
-        "status": "succeeded",
-        "items": [],
-        "summary": {},
-    }
-    return client.post(
-        "/api/v1/device/reports",
-        headers={"Authorization": f"Bearer {token}"},
-        json=payload,
-    )
-
-
-def test_soft_delete_revokes_and_blocks_device_token(client, db, admin_headers):
+def test_soft_delete_revokes_and_blocks_device_token(
+    client, db, admin_headers, make_device, post_empty_report
+):
     token = "tok-delete"
-    dev = _create_device(db, device_key="DEL1", token=token)
+    dev = make_device(device_key="DEL1", token=token)
     pol = _create_policy(db, name="pol1")
     _assign_policy(db, device_id=dev.id, policy_id=pol.id)
     db.commit()
@@ -119,12 +88,12 @@ def test_soft_delete_revokes_and_blocks_device_token(client, db, admin_headers):
     assert body["assignments_removed"] == 1
 
     # Agent token should now be blocked with a clear 403 (not 401).
-    rr = _post_empty_report(client, token)
+    rr = post_empty_report(token)
     assert rr.status_code == 403, rr.text
 
     # Ensure DB reflects deletion.
     db.expire_all()
-    d2 = db.scalar(select(Device).where(Device.id == dev.id))
+    d2 = db.get(Device, dev.id)
     assert d2 is not None
     assert d2.status == DeviceStatus.deleted
     assert d2.deleted_at is not None
@@ -132,9 +101,11 @@ def test_soft_delete_revokes_and_blocks_device_token(client, db, admin_headers):
     assert d2.revoked_auth_token_hash is not None
 
 
-def test_soft_delete_idempotent_does_not_break_revoked_token_mapping(client, db, admin_headers):
+def test_soft_delete_idempotent_does_not_break_revoked_token_mapping(
+    client, db, admin_headers, make_device, post_empty_report
+):
     token = "tok-idem"
-    dev = _create_device(db, device_key="DEL2", token=token)
+    dev = make_device(device_key="DEL2", token=token)
     db.commit()
 
     delete_path = _admin_delete_device_path(client).replace("{device_id}", str(dev.id))
@@ -145,13 +116,13 @@ def test_soft_delete_idempotent_does_not_break_revoked_token_mapping(client, db,
     assert r2.status_code == 200, r2.text
 
     # Still a clear 403, meaning the revoked hash mapping was preserved.
-    rr = _post_empty_report(client, token)
+    rr = post_empty_report(token)
     assert rr.status_code == 403, rr.text
 
 
-def test_list_devices_excludes_deleted_by_default(client, db, admin_headers):
-    _create_device(db, device_key="ACTIVE1", token="a1")
-    dev_b = _create_device(db, device_key="ACTIVE2", token="a2")
+def test_list_devices_excludes_deleted_by_default(client, db, admin_headers, make_device):
+    make_device(device_key="ACTIVE1", token="a1")
+    dev_b = make_device(device_key="ACTIVE2", token="a2")
     db.commit()
 
     delete_path = _admin_delete_device_path(client).replace("{device_id}", str(dev_b.id))
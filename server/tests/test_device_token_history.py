@@ -1,62 +1,84 @@
+import secrets
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
-from fastapi.testclient import TestClient
+import pytest
+from fastapi import HTTPException
 from sqlalchemy import select
+from sqlalchemy.orm import Session
+from starlette.requests import Request
 
-from baseliner_server.api.deps import hash_token
-from baseliner_server.db.models import Device, DeviceAuthToken, DeviceStatus
+from baseliner_server.api.deps import get_current_device, hash_token
+from baseliner_server.core.tenancy import DEFAULT_TENANT_ID, TenantContext, TenantScopedSession
+from baseliner_server.db.models import DeviceAuthToken, EnrollToken
 
 
 def _utcnow() -> datetime:
     return datetime.now(timezone.utc).replace(tzinfo=None)
 
 
-def _create_device(db, *, device_key: str, token: str) -> Device:
-    now = _utcnow()
-    d = Device(
-        device_key=device_key,
-        hostname=f"host-{device_key}",
-        os="windows",
-        os_version="10.0",
-        arch="x64",
-        agent_version="0.1.0-dev",
-        tags={"env": "test"},
-        enrolled_at=now,
-        last_seen_at=now,
-        auth_token_hash=hash_token(token),
-        status=DeviceStatus.active,
+def _device_auth_status(db, token: str) -> int:
+    """
+    Run device auth for `token` without the HTTP stack: 200 if accepted, else the error status.
+
+    Uses a fresh session on the test connection, like a request handler would get.
+    """
+    request = Request(
+        {
+            "type": "http",
+            "method": "POST",
+            "path": "/api/v1/device/reports",
+            "headers": [],
+            "query_string": b"",
+        }
     )
-    db.add(d)
-    db.flush()
-    return d
+    with Session(bind=db.get_bind(), join_transaction_mode="create_savepoint") as s:
+        scoped = TenantScopedSession(s, TenantContext(id=DEFAULT_TENANT_ID, admin_scope="device"))
+        try:
+            get_current_device(request, db=scoped, token=token)
+        except HTTPException as exc:
+            return exc.status_code
+    return 200
+
+
+def _token_rows(db, device_id) -> list[DeviceAuthToken]:
+    # populate_existing refreshes just these rows from the DB (the request handlers wrote them
+    # through another session) instead of expiring everything in the test session.
+    stmt = (
+        select(DeviceAuthToken)
+        .where(DeviceAuthToken.device_id == device_id)
+        .order_by(DeviceAuthToken.created_at)
+        .execution_options(populate_existing=True)
+    )
+    return list(db.scalars(stmt).all())
 
 
-def _post_empty_report(client: TestClient, token: str):
-    payload = {
-        "started_at": datetime.now(timezone.utc).isoformat(),
-        "status": "succeeded",
-        "items": [],
-        "summary": {},
-    }
-    return client.post(
-        "/api/v1/device/reports",
-        headers={"Authorization": f"Bearer {token}"},
-        json=payload,
-    )
+@pytest.fixture()
+def mint_enroll_tokens(db):
+    """
+    Insert N single-use enroll tokens in one commit and return their raw values.
 
+    Skips the admin endpoint round trip per token; tests that exercise minting itself go
+    through `/api/v1/admin/enroll-tokens` instead.
+    """
 
-def _mint_enroll_token(client: TestClient) -> str:
-    resp = client.post("/api/v1/admin/enroll-tokens", json={"ttl_seconds": 3600, "single_use": True})
-    assert resp.status_code == 200, resp.text
-    body = resp.json()
-    return body["token"]
+    def _mint(n: int) -> list[str]:
+        expires_at = _utcnow() + timedelta(hours=1)
+        raws = [secrets.token_urlsafe(24) for _ in range(n)]
+        db.add_all(EnrollToken(token_hash=hash_token(raw), expires_at=expires_at) for raw in raws)
+        db.commit()
+        return raws
+
+    return _mint
 
 
-def test_reenroll_writes_history_and_revokes_previous_token(client, db):
-    enroll_token = _mint_enroll_token(client)
+def test_reenroll_writes_history_and_revokes_previous_token(
+    client, db, mint_enroll_tokens, post_empty_report
+):
+    # End-to-end: the final token checks go through the real reports endpoint.
+    first_enroll_token, second_enroll_token = mint_enroll_tokens(2)
     payload = {
-        "enroll_token": enroll_token,
+        "enroll_token": first_enroll_token,
         "device_key": "REENROLL-1",
         "hostname": "reenroll-host",
         "os": "linux",
@@ -71,48 +93,40 @@ def test_reenroll_writes_history_and_revokes_previous_token(client, db):
     body1 = r1.json()
     device_id = uuid.UUID(body1["device_id"])
     old_token = body1["device_token"]
+    old_hash = hash_token(old_token)
 
-    initial_rows = db.scalars(select(DeviceAuthToken).where(DeviceAuthToken.device_id == device_id)).all()
+    initial_rows = _token_rows(db, device_id)
     assert len(initial_rows) == 1
 
-    payload["enroll_token"] = _mint_enroll_token(client)
+    payload["enroll_token"] = second_enroll_token
     r2 = client.post("/api/v1/enroll", json=payload)
     assert r2.status_code == 200, r2.text
     new_token = r2.json()["device_token"]
     new_hash = hash_token(new_token)
 
-    db.expire_all()
-    rows = db.scalars(
-        select(DeviceAuthToken)
-        .where(DeviceAuthToken.device_id == device_id)
-        .order_by(DeviceAuthToken.created_at)
-    ).all()
+    rows = _token_rows(db, device_id)
     assert len(rows) == 2
 
-    old_row = next(r for r in rows if r.token_hash == hash_token(old_token))
-    new_row = next(r for r in rows if r.token_hash == new_hash)
+    by_hash = {r.token_hash: r for r in rows}
+    old_row = by_hash[old_hash]
+    new_row = by_hash[new_hash]
     assert old_row.revoked_at is not None
     assert old_row.replaced_by_id == new_row.id
     assert new_row.revoked_at is None
 
-    assert _post_empty_report(client, old_token).status_code == 403
-    assert _post_empty_report(client, new_token).status_code == 200
+    assert post_empty_report(old_token).status_code == 403
+    assert post_empty_report(new_token).status_code == 200
 
 
-def test_delete_rotates_and_logs_history(client, db):
+def test_delete_rotates_and_logs_history(client, db, make_device):
     old_token = "tok-history-delete"
-    dev = _create_device(db, device_key="HIST-DEL", token=old_token)
+    dev = make_device(device_key="HIST-DEL", token=old_token)
     db.commit()
 
     resp = client.delete(f"/api/v1/admin/devices/{dev.id}?reason=cleanup")
     assert resp.status_code == 200, resp.text
 
-    db.expire_all()
-    rows = db.scalars(
-        select(DeviceAuthToken)
-        .where(DeviceAuthToken.device_id == dev.id)
-        .order_by(DeviceAuthToken.created_at)
-    ).all()
+    rows = _token_rows(db, dev.id)
     assert len(rows) == 2
     legacy, rotated = rows
     assert legacy.token_hash == hash_token(old_token)
@@ -121,9 +135,9 @@ def test_delete_rotates_and_logs_history(client, db):
     assert rotated.revoked_at is None
 
 
-def test_restore_revokes_deleted_token_and_tracks_history(client, db):
+def test_restore_revokes_deleted_token_and_tracks_history(client, db, make_device):
     original_token = "tok-history-restore"
-    dev = _create_device(db, device_key="HIST-RESTORE", token=original_token)
+    dev = make_device(device_key="HIST-RESTORE", token=original_token)
     db.commit()
 
     delete_resp = client.delete(f"/api/v1/admin/devices/{dev.id}")
@@ -133,37 +147,27 @@ def test_restore_revokes_deleted_token_and_tracks_history(client, db):
     assert restore_resp.status_code == 200, restore_resp.text
     restored_token = restore_resp.json()["device_token"]
 
-    db.expire_all()
-    rows = db.scalars(
-        select(DeviceAuthToken)
-        .where(DeviceAuthToken.device_id == dev.id)
-        .order_by(DeviceAuthToken.created_at)
-    ).all()
+    rows = _token_rows(db, dev.id)
     assert len(rows) == 3
     _, deleted_state_token, restored = rows
     assert deleted_state_token.revoked_at is not None
     assert deleted_state_token.replaced_by_id == restored.id
     assert restored.revoked_at is None
 
-    assert _post_empty_report(client, original_token).status_code == 403
-    assert _post_empty_report(client, restored_token).status_code == 200
+    assert _device_auth_status(db, original_token) == 403
+    assert _device_auth_status(db, restored_token) == 200
 
 
-def test_admin_revoke_writes_history_and_revokes(client, db):
+def test_admin_revoke_writes_history_and_revokes(client, db, make_device):
     old_token = "tok-history-admin-revoke"
-    dev = _create_device(db, device_key="HIST-ADMIN-REVOKE", token=old_token)
+    dev = make_device(device_key="HIST-ADMIN-REVOKE", token=old_token)
     db.commit()
 
     resp = client.post(f"/api/v1/admin/devices/{dev.id}/revoke-token")
     assert resp.status_code == 200, resp.text
     new_token = resp.json()["device_token"]
 
-    db.expire_all()
-    rows = db.scalars(
-        select(DeviceAuthToken)
-        .where(DeviceAuthToken.device_id == dev.id)
-        .order_by(DeviceAuthToken.created_at)
-    ).all()
+    rows = _token_rows(db, dev.id)
     assert len(rows) == 2
     legacy, rotated = rows
     assert legacy.token_hash == hash_token(old_token)
@@ -171,5 +175,5 @@ def test_admin_revoke_writes_history_and_revokes(client, db):
     assert legacy.replaced_by_id == rotated.id
     assert rotated.revoked_at is None
 
-    assert _post_empty_report(client, old_token).status_code == 403
-    assert _post_empty_report(client, new_token).status_code == 200
+    assert _device_auth_status(db, old_token) == 403
+    assert _device_auth_status(db, new_token) == 200
@@ -0,0 +1,83 @@
+import secrets
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import sqlalchemy as sa
+from baseliner_server.api.deps import hash_token
+from baseliner_server.api.v1 import enroll as enroll_module
+from baseliner_server.db.models import Device, EnrollToken
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _enroll_payload(enroll_token: str, device_key: str) -> dict:
+    return {
+        "enroll_token": enroll_token,
+        "device_key": device_key,
+        "hostname": f"host-{device_key}",
+        "os": "windows",
+        "os_version": "10.0",
+        "arch": "x64",
+        "agent_version": "0.1.0-dev",
+        "tags": {"env": "test"},
+    }
+
+
+@pytest.fixture()
+def enroll_token(db) -> str:
+    raw = secrets.token_urlsafe(24)
+    db.add(EnrollToken(token_hash=hash_token(raw), expires_at=_utcnow() + timedelta(hours=1)))
+    db.commit()
+    return raw
+
+
+def test_enroll_token_cannot_be_reused(client, db, enroll_token):
+    r1 = client.post("/api/v1/enroll", json=_enroll_payload(enroll_token, "SINGLE-USE-1"))
+    assert r1.status_code == 200, r1.text
+
+    row = db.scalar(
+        select(EnrollToken)
+        .where(EnrollToken.token_hash == hash_token(enroll_token))
+        .execution_options(populate_existing=True)
+    )
+    assert row.used_at is not None
+    assert str(row.used_by_device_id) == r1.json()["device_id"]
+
+    r2 = client.post("/api/v1/enroll", json=_enroll_payload(enroll_token, "SINGLE-USE-2"))
+    assert r2.status_code == 409, r2.text
+    assert r2.json()["detail"] == "Enroll token already used"
+
+
+def test_enroll_token_claim_lost_to_concurrent_enrollment(
+    client, db, db_connection, enroll_token, monkeypatch
+):
+    """Another enrollment claims the token between our SELECT and the conditional UPDATE."""
+
+    token_hash = hash_token(enroll_token)
+    real_update = enroll_module.update
+
+    def _update_after_competing_claim(table):
+        if table is EnrollToken:
+            # A second session on the same connection flips used_at first, as a racing
+            # request would after both passed the `used_at is None` check.
+            with Session(bind=db_connection, join_transaction_mode="create_savepoint") as other:
+                other.execute(
+                    sa.update(EnrollToken)
+                    .where(EnrollToken.token_hash == token_hash)
+                    .values(used_at=_utcnow())
+                )
+                other.commit()
+        return real_update(table)
+
+    monkeypatch.setattr(enroll_module, "update", _update_after_competing_claim)
+
+    r = client.post("/api/v1/enroll", json=_enroll_payload(enroll_token, "LOST-CLAIM"))
+    assert r.status_code == 409, r.text
+    assert r.json()["detail"] == "Enroll token already used"
+
+    # The losing request rolled back before doing any device work.
+    assert db.scalar(select(Device).where(Device.device_key == "LOST-CLAIM")) is None
@@ -9,6 +9,13 @@ from baseliner_server.core.config import settings
 from baseliner_server.core.tenancy import DEFAULT_TENANT_ID
 from baseliner_server.db.models import AdminKey, AdminScope, Device, EnrollToken, Run, Tenant
 
+TENANT_B_ID = uuid.uuid4()
+TENANT_B_ADMIN_KEY = "tenant-b-admin"
+TENANT_B_ADMIN_KEY_HASH = hash_admin_key(TENANT_B_ADMIN_KEY)
+
+HEADERS_A = {"X-Admin-Key": settings.baseliner_admin_key, "X-Tenant-ID": str(DEFAULT_TENANT_ID)}
+HEADERS_B = {"X-Admin-Key": TENANT_B_ADMIN_KEY, "X-Tenant-ID": str(TENANT_B_ID)}
+
 
 def _utcnow() -> datetime:
     return datetime.now(timezone.utc)
@@ -46,24 +53,23 @@ def _make_report_payload() -> dict:
 
 
 def test_two_tenants_isolated_end_to_end(client: TestClient, db):
-    tenant_b = Tenant(id=uuid.uuid4(), name="tenant-b", created_at=_utcnow(), is_active=True)
-    db.add(tenant_b)
-    db.add(
-        AdminKey(
-            tenant_id=tenant_b.id,
-            key_hash=hash_admin_key("tenant-b-admin"),
-            scope=AdminScope.tenant_admin,
-            note="tenant-b",
-        )
+    # The tenant id is assigned client-side, so both rows go out in a single commit.
+    tenant_b = Tenant(id=TENANT_B_ID, name="tenant-b", created_at=_utcnow(), is_active=True)
+    db.add_all(
+        [
+            tenant_b,
+            AdminKey(
+                tenant_id=tenant_b.id,
+                key_hash=TENANT_B_ADMIN_KEY_HASH,
+                scope=AdminScope.tenant_admin,
+                note="tenant-b",
+            ),
+        ]
     )
-    db.flush()
     db.commit()
 
-    headers_a = {"X-Admin-Key": settings.baseliner_admin_key, "X-Tenant-ID": str(DEFAULT_TENANT_ID)}
-    headers_b = {"X-Admin-Key": "tenant-b-admin", "X-Tenant-ID": str(tenant_b.id)}
-
-    tok_a = client.post("/api/v1/admin/enroll-tokens", headers=headers_a, json={})
-    tok_b = client.post("/api/v1/admin/enroll-tokens", headers=headers_b, json={})
+    tok_a = client.post("/api/v1/admin/enroll-tokens", headers=HEADERS_A, json={})
+    tok_b = client.post("/api/v1/admin/enroll-tokens", headers=HEADERS_B, json={})
     assert tok_a.status_code == 200, tok_a.text
     assert tok_b.status_code == 200, tok_b.text
 
@@ -84,14 +90,14 @@ def test_two_tenants_isolated_end_to_end(client: TestClient, db):
     assert device_b_row is not None
     assert device_b_row.tenant_id == tenant_b.id
 
-    pol_a = client.post("/api/v1/admin/policies", headers=headers_a, json=_make_policy_payload("policy-a"))
-    pol_b = client.post("/api/v1/admin/policies", headers=headers_b, json=_make_policy_payload("policy-b"))
+    pol_a = client.post("/api/v1/admin/policies", headers=HEADERS_A, json=_make_policy_payload("policy-a"))
+    pol_b = client.post("/api/v1/admin/policies", headers=HEADERS_B, json=_make_policy_payload("policy-b"))
     assert pol_a.status_code == 200, pol_a.text
     assert pol_b.status_code == 200, pol_b.text
 
     assign_a = client.post(
         "/api/v1/admin/assign-policy",
-        headers=headers_a,
+        headers=HEADERS_A,
         json={
             "device_id": device_a["device_id"],
             "policy_name": "policy-a",
@@ -101,7 +107,7 @@ def test_two_tenants_isolated_end_to_end(client: TestClient, db):
     )
     assign_b = client.post(
         "/api/v1/admin/assign-policy",
-        headers=headers_b,
+        headers=HEADERS_B,
         json={
             "device_id": device_b["device_id"],
             "policy_name": "policy-b",
@@ -130,8 +136,8 @@ def test_two_tenants_isolated_end_to_end(client: TestClient, db):
     assert len(runs_a) == 1
     assert len(runs_b) == 1
 
-    list_a = client.get("/api/v1/admin/devices", headers=headers_a)
-    list_b = client.get("/api/v1/admin/devices", headers=headers_b)
+    list_a = client.get("/api/v1/admin/devices", headers=HEADERS_A)
+    list_b = client.get("/api/v1/admin/devices", headers=HEADERS_B)
     assert list_a.status_code == 200, list_a.text
     assert list_b.status_code == 200, list_b.text
 
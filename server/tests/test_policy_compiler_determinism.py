@@ -3,7 +3,7 @@ from __future__ import annotations
 import uuid
 from datetime import datetime, timedelta, timezone
 
-from baseliner_server.db.models import AssignmentMode, Device, Policy, PolicyAssignment
+from baseliner_server.db.models import AssignmentMode, Policy, PolicyAssignment
 from baseliner_server.services.policy_compiler import compile_effective_policy
 
 
@@ -11,48 +11,35 @@ def utcnow() -> datetime:
     return datetime.now(timezone.utc)
 
 
-def _create_device(db, *, device_key: str) -> Device:
-    d = Device(
-        device_key=device_key,
-        hostname="host-" + device_key,
-        os="windows",
-        os_version="10.0",
-        arch="x64",
-        agent_version="0.1.0-dev",
-        tags={"env": "test"},
-        enrolled_at=utcnow(),
-        last_seen_at=utcnow(),
-        auth_token_hash="testhash",
-    )
-    db.add(d)
-    db.flush()
-    return d
+# Same resource key across policies (type + id); only "name" differs, to identify the winner.
+_FIREFOX_RESOURCE = {
+    "type": "winget.package",
+    "id": "mozilla.firefox",
+    "package_id": "Mozilla.Firefox",
+    "ensure": "present",
+}
 
 
-def _create_policy(db, *, name: str, resource_name: str) -> Policy:
-    # Same resource key across policies (type + id), but with a distinguishing field ("name")
-    p = Policy(
+def _policy(*, name: str, resource_name: str, now: datetime) -> Policy:
+    return Policy(
         name=name,
         description="",
         schema_version="1.0",
         is_active=True,
-        document={
-            "resources": [
-                {
-                    "type": "winget.package",
-                    "id": "mozilla.firefox",  # ensure same resource key across policies
-                    "package_id": "Mozilla.Firefox",
-                    "ensure": "present",
-                    "name": resource_name,  # distinguish winner
-                }
-            ]
-        },
-        created_at=utcnow(),
-        updated_at=utcnow(),
+        document={"resources": [{**_FIREFOX_RESOURCE, "name": resource_name}]},
+        created_at=now,
+        updated_at=now,
     )
-    db.add(p)
+
+
+def _create_policy_pair(db) -> tuple[Policy, Policy]:
+    """pol-a / pol-b with conflicting resources, flushed together."""
+    now = utcnow()
+    p_a = _policy(name="pol-a", resource_name="FROM-A", now=now)
+    p_b = _policy(name="pol-b", resource_name="FROM-B", now=now)
+    db.add_all([p_a, p_b])
     db.flush()
-    return p
+    return p_a, p_b
 
 
 def _assign(
@@ -86,11 +73,10 @@ def _compiled_first_resource_name(snap) -> str:
     return str(first.get("name") or "")
 
 
-def test_compiler_priority_lower_number_wins(db):
+def test_compiler_priority_lower_number_wins(db, make_device):
     """Lower priority number should win (priority ASC)."""
-    d = _create_device(db, device_key="D-DET-PRIO")
-    p_a = _create_policy(db, name="pol-a", resource_name="FROM-A")
-    p_b = _create_policy(db, name="pol-b", resource_name="FROM-B")
+    d = make_device(device_key="D-DET-PRIO")
+    p_a, p_b = _create_policy_pair(db)
 
     t = utcnow()
     _assign(db, device_id=d.id, policy_id=p_a.id, priority=100, created_at=t)
@@ -107,11 +93,10 @@ def test_compiler_priority_lower_number_wins(db):
     assert len(conflicts) >= 1
 
 
-def test_compiler_created_at_tiebreaker_earlier_wins(db):
+def test_compiler_created_at_tiebreaker_earlier_wins(db, make_device):
     """If priorities tie, earlier assignment.created_at wins."""
-    d = _create_device(db, device_key="D-DET-CT")
-    p_a = _create_policy(db, name="pol-a", resource_name="FROM-A")
-    p_b = _create_policy(db, name="pol-b", resource_name="FROM-B")
+    d = make_device(device_key="D-DET-CT")
+    p_a, p_b = _create_policy_pair(db)
 
     t = utcnow()
     _assign(db, device_id=d.id, policy_id=p_a.id, priority=100, created_at=t)
@@ -128,11 +113,10 @@ def test_compiler_created_at_tiebreaker_earlier_wins(db):
     assert assigns[0].get("policy_name") in ("pol-a", "pol-a")  # tolerate exact key naming
 
 
-def test_compiler_assignment_id_tiebreaker_lower_uuid_wins(db):
+def test_compiler_assignment_id_tiebreaker_lower_uuid_wins(db, make_device):
     """If priority + created_at tie, assignment_id ASC should win."""
-    d = _create_device(db, device_key="D-DET-ID")
-    p_a = _create_policy(db, name="pol-a", resource_name="FROM-A")
-    p_b = _create_policy(db, name="pol-b", resource_name="FROM-B")
+    d = make_device(device_key="D-DET-ID")
+    p_a, p_b = _create_policy_pair(db)
 
     t = utcnow()
 
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import threading
 from datetime import datetime, timezone
 
 from baseliner_server.api.deps import hash_token
@@ -121,3 +122,41 @@ def test_device_reports_rate_limited_by_ip_when_unauth(client: TestClient):
     finally:
         client.app.state.rate_limit_config = original_cfg
         client.app.state.rate_limiter = original_limiter
+
+
+def test_rate_limiter_does_not_over_admit_under_concurrency():
+    limiter = InMemoryRateLimiter()
+    results: list[bool] = []
+
+    def hit() -> None:
+        allowed, _ = limiter.consume(key="device:x", capacity=5, per_minute=1, now=100.0)
+        results.append(allowed)
+
+    threads = [threading.Thread(target=hit) for _ in range(50)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results.count(True) == 5
+
+
+def test_rate_limiter_prunes_oldest_buckets_over_max_entries():
+    limiter = InMemoryRateLimiter(max_entries=2, stale_after_seconds=3600)
+    for i, key in enumerate(["a", "b", "c"]):
+        limiter.consume(key=key, capacity=1, per_minute=1, now=float(i))
+
+    # "a" was evicted, so it gets a fresh (full) bucket again.
+    assert limiter.consume(key="a", capacity=1, per_minute=1, now=3.0)[0] is True
+    assert limiter.consume(key="c", capacity=1, per_minute=1, now=3.0)[0] is False
+
+
+def test_rate_limiter_trims_in_chunks_under_key_floods():
+    limiter = InMemoryRateLimiter(max_entries=100, stale_after_seconds=3600)
+    for i in range(101):
+        limiter.consume(key=f"ip:{i}", capacity=1, per_minute=1, now=float(i))
+
+    # One sweep frees 5% headroom, so the next few new keys do not each trigger another sweep.
+    assert len(limiter._buckets) == 95
+    assert "ip:0" not in limiter._buckets
+    assert "ip:100" in limiter._buckets
@@ -27,7 +27,7 @@ def test_phase0_default_tenant_and_row_stamping(client, db):
     raw_token = body["token"]
     token_id = uuid.UUID(body["token_id"])
 
-    tok_row = db.scalar(select(EnrollToken).where(EnrollToken.id == token_id))
+    tok_row = db.get(EnrollToken, token_id)
     assert tok_row is not None
     assert tok_row.tenant_id == DEFAULT_TENANT_ID
 
@@ -59,9 +59,11 @@ def test_enroll_token_listing_respects_tenant_context(client, db):
         )
     )
     db.commit()
+    # Resolve the id now: the override runs mid-request and must not touch the test session.
+    other_tenant_id = other_tenant.id
 
     app.dependency_overrides[get_tenant_context] = lambda: TenantContext(
-        id=other_tenant.id, admin_scope="tenant"
+        id=other_tenant_id, admin_scope="tenant"
     )
     try:
         resp = client.get("/api/v1/admin/enroll-tokens")
@@ -1,32 +1,26 @@
 from __future__ import annotations
 
+import copy
+import csv
 import os
+import sys
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, Iterator
 
 import typer
-from rich.console import Console
 
 from baseliner_admin.client import (
     DEFAULT_TENANT_ID,
+    ApiError,
     BaselinerAdminClient,
     ClientConfig,
 )
-from baseliner_admin.render import (
-    render_admin_keys_list,
-    render_assignments_list,
-    render_assignments_plan,
-    render_devices_list,
-    render_device_tokens_list,
-    render_enroll_tokens_list,
-    render_policy_detail,
-    render_policies_list,
-    render_run_detail,
-    render_runs_list,
-    render_tenants_list,
-)
-from baseliner_admin.tui import die_tui_not_supported, run_tui
-from baseliner_admin.util import read_json_file, try_parse_uuid
+from baseliner_admin.util import list_field, read_json_file, try_parse_uuid
+
+# rich (and the render/tui modules built on it) is imported only in the branches that actually
+# draw a table or message, so --json output and UUID refs that resolve without a lookup skip it.
+if TYPE_CHECKING:  # pragma: no cover
+    from rich.console import Console
 
 app = typer.Typer(add_completion=False, help="Baseliner admin CLI")
 devices_app = typer.Typer(add_completion=False, help="Device administration")
@@ -35,6 +29,7 @@ policies_app = typer.Typer(add_completion=False, help="Policy administration")
 assignments_app = typer.Typer(add_completion=False, help="Policy assignment management")
 enroll_app = typer.Typer(add_completion=False, help="Enrollment token management")
 tenants_app = typer.Typer(add_completion=False, help="Tenant lifecycle (superadmin)")
+audit_app = typer.Typer(add_completion=False, help="Audit log inspection")
 
 app.add_typer(devices_app, name="devices")
 app.add_typer(runs_app, name="runs")
@@ -42,6 +37,7 @@ app.add_typer(policies_app, name="policies")
 app.add_typer(assignments_app, name="assignments")
 app.add_typer(enroll_app, name="enroll")
 app.add_typer(tenants_app, name="tenants")
+app.add_typer(audit_app, name="audit")
 
 
 @app.callback()
@@ -83,36 +79,51 @@ def main_callback(
 
 
 def _client(ctx: typer.Context) -> BaselinerAdminClient:
+    # One client per invocation: helpers that resolve refs and the command itself share it.
     o = ctx.obj or {}
-    return BaselinerAdminClient(
-        ClientConfig(
-            server=o["server_url"],
-            admin_key=o["admin_key"],
-            tenant_id=o["tenant_id"],
+    client = o.get("client")
+    if client is None:
+        client = BaselinerAdminClient(
+            ClientConfig(
+                server=o["server_url"],
+                admin_key=o["admin_key"],
+                tenant_id=o["tenant_id"],
+            )
         )
-    )
+        o["client"] = client
+        # Release pooled keep-alive connections when the command finishes.
+        ctx.call_on_close(client.close)
+    return client
 
 
-def _console() -> Console:
-    # If output is redirected, avoid rich's color codes.
-    no_color = not os.isatty(1)
-    return Console(no_color=no_color)
+def _console(ctx: typer.Context) -> Console:
+    # Built on first use and then reused for the rest of the invocation.
+    from rich.console import Console
+
+    o = ctx.obj or {}
+    console = o.get("console")
+    if console is None:
+        # If output is redirected, avoid rich's color codes.
+        console = Console(no_color=not os.isatty(1))
+        o["console"] = console
+    return console
+
 
 @app.command("whoami")
 def whoami(ctx: typer.Context) -> None:
     """Show the resolved tenant + admin identity (debug helper)."""
     client = _client(ctx)
-    console = _console()
     try:
         payload = client.whoami()
     except Exception as e:
-        console.print(f"[red]Error:[/red] {e}")
+        _console(ctx).print(f"[red]Error:[/red] {e}")
         raise typer.Exit(code=1)
 
     if (ctx.obj or {}).get("json"):
-        console.print(BaselinerAdminClient.pretty_json(payload))
+        print(BaselinerAdminClient.pretty_json(payload))
         return
 
+    console = _console(ctx)
     tenant_id = str(payload.get("tenant_id") or "")
     ak = payload.get("admin_key") or {}
     console.print(f"Tenant: {tenant_id}")
@@ -126,7 +137,7 @@ def whoami(ctx: typer.Context) -> None:
 def _resolve_device_id(
     *,
     client: BaselinerAdminClient,
-    console: Console,
+    ctx: typer.Context,
     device_ref: str,
     include_deleted: bool = True,
 ) -> str:
@@ -135,9 +146,13 @@ def _resolve_device_id(
     if u:
         return str(u)
 
+    # Let the server narrow the list; the local filter below still applies so older servers
+    # that ignore `q` resolve the same way.
     q = device_ref.lower()
-    payload = client.devices_list(limit=500, offset=0, include_deleted=include_deleted)
-    items = list(payload.get("items") or [])
+    payload = client.devices_list(
+        limit=500, offset=0, include_deleted=include_deleted, q=device_ref
+    )
+    items = list_field(payload, "items")
     matches = [
         d
         for d in items
@@ -149,12 +164,14 @@ def _resolve_device_id(
         return str(matches[0].get("id"))
 
     if not matches:
-        console.print(f"No devices matched: {device_ref}")
+        _console(ctx).print(f"No devices matched: {device_ref}")
         raise typer.Exit(code=1)
 
-    console.print(f"Ambiguous device reference: {device_ref}")
+    _console(ctx).print(f"Ambiguous device reference: {device_ref}")
+    from baseliner_admin.render import render_devices_list
+
     render_devices_list(
-        console,
+        _console(ctx),
         {"items": matches, "total": len(matches), "limit": len(matches), "offset": 0},
         title="Device matches",
     )
@@ -164,7 +181,7 @@ def _resolve_device_id(
 def _resolve_policy_name(
     *,
     client: BaselinerAdminClient,
-    console: Console,
+    ctx: typer.Context,
     policy_ref: str,
     include_inactive: bool = True,
 ) -> str:
@@ -174,7 +191,7 @@ def _resolve_policy_name(
         pol = client.policies_show(str(u))
         name = str(pol.get("name") or "").strip()
         if not name:
-            console.print(f"Policy {u} missing name")
+            _console(ctx).print(f"Policy {u} missing name")
             raise typer.Exit(code=1)
         return name
 
@@ -184,7 +201,7 @@ def _resolve_policy_name(
         include_inactive=include_inactive,
         q=policy_ref,
     )
-    items = list(payload.get("items") or [])
+    items = list_field(payload, "items")
     q = policy_ref.lower()
 
     exact = [p for p in items if str(p.get("name") or "").strip().lower() == q]
@@ -195,11 +212,13 @@ def _resolve_policy_name(
         return str(items[0].get("name"))
 
     if not items:
-        console.print(f"No policies matched: {policy_ref}")
+        _console(ctx).print(f"No policies matched: {policy_ref}")
         raise typer.Exit(code=1)
 
-    console.print(f"Ambiguous policy reference: {policy_ref}")
-    render_policies_list(console, payload)
+    _console(ctx).print(f"Ambiguous policy reference: {policy_ref}")
+    from baseliner_admin.render import render_policies_list
+
+    render_policies_list(_console(ctx), payload)
     raise typer.Exit(code=2)
 
 
@@ -207,7 +226,7 @@ def _resolve_policy_name(
 def _resolve_policy_id_and_name(
     *,
     client: BaselinerAdminClient,
-    console: Console,
+    ctx: typer.Context,
     policy_ref: str,
     include_inactive: bool = True,
 ) -> tuple[str, str]:
@@ -218,7 +237,6 @@ def _resolve_policy_id_and_name(
       - exact policy name
       - substring (must uniquely match)
     """
-
     policy_ref = policy_ref.strip()
     u = try_parse_uuid(policy_ref)
     if u:
@@ -226,7 +244,7 @@ def _resolve_policy_id_and_name(
         pid = str(pol.get("id") or "").strip()
         name = str(pol.get("name") or "").strip()
         if not pid or not name:
-            console.print(f"Policy {u} missing id or name")
+            _console(ctx).print(f"Policy {u} missing id or name")
             raise typer.Exit(code=1)
         return pid, name
 
@@ -236,7 +254,7 @@ def _resolve_policy_id_and_name(
         include_inactive=include_inactive,
         q=policy_ref,
     )
-    items = list(payload.get("items") or [])
+    items = list_field(payload, "items")
     q = policy_ref.lower()
 
     exact = [p for p in items if str(p.get("name") or "").strip().lower() == q]
@@ -244,7 +262,7 @@ def _resolve_policy_id_and_name(
         pid = str(exact[0].get("id") or "").strip()
         name = str(exact[0].get("name") or "").strip()
         if not pid or not name:
-            console.print(f"Policy matched but missing id/name: {policy_ref}")
+            _console(ctx).print(f"Policy matched but missing id/name: {policy_ref}")
             raise typer.Exit(code=1)
         return pid, name
 
@@ -252,22 +270,24 @@ def _resolve_policy_id_and_name(
         pid = str(items[0].get("id") or "").strip()
         name = str(items[0].get("name") or "").strip()
         if not pid or not name:
-            console.print(f"Policy matched but missing id/name: {policy_ref}")
+            _console(ctx).print(f"Policy matched but missing id/name: {policy_ref}")
             raise typer.Exit(code=1)
         return pid, name
 
     if not items:
-        console.print(f"No policies matched: {policy_ref}")
+        _console(ctx).print(f"No policies matched: {policy_ref}")
         raise typer.Exit(code=1)
 
-    console.print(f"Ambiguous policy reference: {policy_ref}")
-    render_policies_list(console, payload)
+    _console(ctx).print(f"Ambiguous policy reference: {policy_ref}")
+    from baseliner_admin.render import render_policies_list
+
+    render_policies_list(_console(ctx), payload)
     raise typer.Exit(code=2)
 
 
 def _resolve_assignment_policy(
     *,
-    console: Console,
+    ctx: typer.Context,
     policy_ref: str,
     assignments: list[dict[str, Any]],
 ) -> tuple[str, str]:
@@ -275,7 +295,6 @@ def _resolve_assignment_policy(
 
     Returns (policy_id, policy_name) for a unique match.
     """
-
     ref = policy_ref.strip()
     if not ref:
         raise typer.BadParameter("policy reference must not be empty")
@@ -309,16 +328,18 @@ def _resolve_assignment_policy(
         pol_id = str(m.get("policy_id") or "").strip()
         pol_name = str(m.get("policy_name") or "").strip()
         if not pol_id or not pol_name:
-            console.print("Matched assignment is missing policy_id or policy_name")
+            _console(ctx).print("Matched assignment is missing policy_id or policy_name")
             raise typer.Exit(code=1)
         return pol_id, pol_name
 
     if not matches:
-        console.print(f"No assignments matched policy ref: {policy_ref}")
+        _console(ctx).print(f"No assignments matched policy ref: {policy_ref}")
         raise typer.Exit(code=1)
 
-    console.print(f"Ambiguous policy ref within assignments: {policy_ref}")
-    render_assignments_list(console, {"device_id": "", "assignments": matches}, title="Matches")
+    _console(ctx).print(f"Ambiguous policy ref within assignments: {policy_ref}")
+    from baseliner_admin.render import render_assignments_list
+
+    render_assignments_list(_console(ctx), {"device_id": "", "assignments": matches}, title="Matches")
     raise typer.Exit(code=2)
 
 
@@ -364,21 +385,51 @@ def _load_assignments_file(path: Path) -> list[dict[str, Any]]:
             "Assignments file must be a JSON list, or an object with an 'assignments' list"
         )
 
-    out: list[dict[str, Any]] = []
     for idx, item in enumerate(obj, start=1):
         if not isinstance(item, dict):
             raise typer.BadParameter(f"Assignment entry #{idx} must be an object")
-        out.append(item)
 
-    return out
+    return obj
+
+
+def _policy_index(client: BaselinerAdminClient) -> dict[str, tuple[str, str]]:
+    """Fetch policies once and index them by lowercased id and exact name.
+
+    Used to seed `_normalize_assignment_spec`'s cache. Names that occur more than once are left
+    out so the resolver still reports them as ambiguous; substrings are never indexed.
+    """
+    payload = client.policies_list(limit=500, offset=0, include_inactive=True)
+    index: dict[str, tuple[str, str]] = {}
+    names_seen: dict[str, int] = {}
+    for p in list_field(payload, "items"):
+        pid = str(p.get("id") or "").strip()
+        name = str(p.get("name") or "").strip()
+        if not pid or not name:
+            continue
+        index[pid.lower()] = (pid, name)
+        names_seen[name.lower()] = names_seen.get(name.lower(), 0) + 1
+        index[name.lower()] = (pid, name)
+    for key, count in names_seen.items():
+        if count > 1:
+            index.pop(key, None)
+    return index
 
 
 def _normalize_assignment_spec(
     *,
     client: BaselinerAdminClient,
-    console: Console,
+    ctx: typer.Context,
     spec: dict[str, Any],
+    resolved: dict[str, tuple[str, str]] | None = None,
 ) -> dict[str, Any]:
+    """Normalize one assignments-file entry to policy_id/policy_name/priority/mode.
+
+    `resolved` caches policy refs across the entries of one file, so a policy named several
+    times is looked up only once. A fallback lookup is cached under its ref and the policy id
+    only; the resolver matches refs case-insensitively, so the lowercased ref is safe, but the
+    resolved name is not cached because another policy may share it case-insensitively (see
+    `_policy_index`).
+    """
     policy_ref = spec.get("policy") or spec.get("policy_ref")
     policy_id = spec.get("policy_id")
     policy_name = spec.get("policy_name")
@@ -392,7 +443,16 @@ def _normalize_assignment_spec(
         ref = str(policy_ref or policy_id or policy_name or "").strip()
         if not ref:
             raise typer.BadParameter("Each assignment must include policy/policy_id/policy_name")
-        pid, name = _resolve_policy_id_and_name(client=client, console=console, policy_ref=ref)
+        hit = resolved.get(ref.lower()) if resolved is not None else None
+        if hit is None:
+            pid, name = _resolve_policy_id_and_name(
+                client=client, ctx=ctx, policy_ref=ref
+            )
+            if resolved is not None:
+                for key in (ref, pid):
+                    resolved[key.lower()] = (pid, name)
+        else:
+            pid, name = hit
 
     prio_raw = spec.get("priority")
     try:
@@ -507,10 +567,12 @@ def _plan_counts(rows: list[dict[str, Any]]) -> dict[str, int]:
 
 @app.command("tui", help="EXPERIMENTAL: prompt-driven operator console")
 def tui(ctx: typer.Context) -> None:
+    from baseliner_admin.tui import die_tui_not_supported, run_tui
+
     if ctx.obj.get("json"):
         raise typer.BadParameter("--json is not supported for the interactive tui")
 
-    console = _console()
+    console = _console(ctx)
     if not (os.isatty(0) and os.isatty(1)):
         die_tui_not_supported(console)
 
@@ -536,7 +598,7 @@ def enroll_create(
     if ctx.obj.get("json"):
         print(c.pretty_json(payload))
         return
-    _console().print_json(data=payload)
+    _console(ctx).print_json(data=payload)
 
 
 @enroll_app.command("list")
@@ -557,7 +619,9 @@ def enroll_list(
     if ctx.obj.get("json"):
         print(c.pretty_json(payload))
         return
-    render_enroll_tokens_list(_console(), payload)
+    from baseliner_admin.render import render_enroll_tokens_list
+
+    render_enroll_tokens_list(_console(ctx), payload)
 
 
 @enroll_app.command("revoke")
@@ -571,7 +635,7 @@ def enroll_revoke(
     if ctx.obj.get("json"):
         print(c.pretty_json(payload))
         return
-    _console().print_json(data=payload)
+    _console(ctx).print_json(data=payload)
 
 
 @devices_app.command("list")
@@ -588,7 +652,9 @@ def devices_list(
         print(c.pretty_json(payload))
         return
 
-    render_devices_list(_console(), payload)
+    from baseliner_admin.render import render_devices_list
+
+    render_devices_list(_console(ctx), payload)
 
 
 @devices_app.command("find")
@@ -598,8 +664,10 @@ def devices_find(
     include_deleted: bool = typer.Option(False, "--include-deleted"),
 ) -> None:
     c = _client(ctx)
-    payload = c.devices_list(limit=500, offset=0, include_deleted=include_deleted)
-    items = payload.get("items") or []
+    payload = c.devices_list(
+        limit=500, offset=0, include_deleted=include_deleted, q=query.strip()
+    )
+    items = list_field(payload, "items")
 
     q = query.strip().lower()
     matches = [
@@ -614,11 +682,13 @@ def devices_find(
         return
 
     if not matches:
-        _console().print(f"No devices matched: {query}")
+        _console(ctx).print(f"No devices matched: {query}")
         raise typer.Exit(code=1)
 
+    from baseliner_admin.render import render_devices_list
+
     render_devices_list(
-        _console(), {"items": matches, "total": len(matches), "limit": 500, "offset": 0}
+        _console(ctx), {"items": matches, "total": len(matches), "limit": 500, "offset": 0}
     )
 
 
@@ -629,7 +699,7 @@ def devices_debug(ctx: typer.Context, device_id: str) -> None:
     if ctx.obj.get("json"):
         print(c.pretty_json(payload))
         return
-    _console().print_json(data=payload)
+    _console(ctx).print_json(data=payload)
 
 
 @devices_app.command("delete")
@@ -643,7 +713,7 @@ def devices_delete(
     if ctx.obj.get("json"):
         print(c.pretty_json(payload))
         return
-    _console().print_json(data=payload)
+    _console(ctx).print_json(data=payload)
 
 
 @devices_app.command("deactivate")
@@ -661,7 +731,7 @@ def devices_deactivate(
     if ctx.obj.get("json"):
         print(c.pretty_json(payload))
         return
-    _console().print_json(data=payload)
+    _console(ctx).print_json(data=payload)
 
 
 @devices_app.command("restore")
@@ -671,7 +741,7 @@ def devices_restore(ctx: typer.Context, device_id: str) -> None:
     if ctx.obj.get("json"):
         print(c.pretty_json(payload))
         return
-    _console().print_json(data=payload)
+    _console(ctx).print_json(data=payload)
 
 
 @devices_app.command("deactivate")
@@ -685,7 +755,7 @@ def devices_deactivate(
     if ctx.obj.get("json"):
         print(c.pretty_json(payload))
         return
-    _console().print_json(data=payload)
+    _console(ctx).print_json(data=payload)
 
 
 @devices_app.command("reactivate")
@@ -695,7 +765,7 @@ def devices_reactivate(ctx: typer.Context, device_id: str) -> None:
     if ctx.obj.get("json"):
         print(c.pretty_json(payload))
         return
-    _console().print_json(data=payload)
+    _console(ctx).print_json(data=payload)
 
 
 @devices_app.command("rotate-token")
@@ -709,7 +779,7 @@ def devices_rotate_token(
     if ctx.obj.get("json"):
         print(c.pretty_json(payload))
         return
-    _console().print_json(data=payload)
+    _console(ctx).print_json(data=payload)
 
 
 @devices_app.command("revoke-token")
@@ -719,7 +789,7 @@ def devices_revoke_token(ctx: typer.Context, device_id: str) -> None:
     if ctx.obj.get("json"):
         print(c.pretty_json(payload))
         return
-    _console().print_json(data=payload)
+    _console(ctx).print_json(data=payload)
 
 
 @devices_app.command("rotate-token")
@@ -733,7 +803,7 @@ def devices_rotate_token(ctx: typer.Context, device_id: str) -> None:
     if ctx.obj.get("json"):
         print(c.pretty_json(payload))
         return
-    _console().print_json(data=payload)
+    _console(ctx).print_json(data=payload)
 
 
 @runs_app.command("list")
@@ -748,7 +818,9 @@ def runs_list(
     if ctx.obj.get("json"):
         print(c.pretty_json(payload))
         return
-    render_runs_list(_console(), payload)
+    from baseliner_admin.render import render_runs_list
+
+    render_runs_list(_console(ctx), payload)
 
 
 @runs_app.command("show")
@@ -766,7 +838,9 @@ def runs_show(
     if ctx.obj.get("json"):
         print(c.pretty_json(payload))
         return
-    render_run_detail(_console(), payload, full=full, logs_limit=int(logs_limit))
+    from baseliner_admin.render import render_run_detail
+
+    render_run_detail(_console(ctx), payload, full=full, logs_limit=int(logs_limit))
 
 
 @devices_app.command("tokens")
@@ -777,7 +851,9 @@ def devices_tokens(ctx: typer.Context, device_id: str) -> None:
     if ctx.obj.get("json"):
         print(c.pretty_json(payload))
         return
-    render_device_tokens_list(_console(), payload, title=f"Device tokens: {device_id}")
+    from baseliner_admin.render import render_device_tokens_list
+
+    render_device_tokens_list(_console(ctx), payload, title=f"Device tokens: {device_id}")
 
 @policies_app.command("list")
 def policies_list(
@@ -791,7 +867,9 @@ def policies_list(
     if ctx.obj.get("json"):
         print(c.pretty_json(payload))
         return
-    render_policies_list(_console(), payload)
+    from baseliner_admin.render import render_policies_list
+
+    render_policies_list(_console(ctx), payload)
 
 
 @policies_app.command("find")
@@ -812,7 +890,9 @@ def policies_find(
     if ctx.obj.get("json"):
         print(c.pretty_json(payload))
         return
-    render_policies_list(_console(), payload)
+    from baseliner_admin.render import render_policies_list
+
+    render_policies_list(_console(ctx), payload)
 
 
 @policies_app.command("show")
@@ -830,7 +910,7 @@ def policies_show(
         pol_id = str(u)
     else:
         search = c.policies_list(include_inactive=include_inactive, q=ref, limit=200, offset=0)
-        items = search.get("items") or []
+        items = list_field(search, "items")
 
         exact = [
             p for p in items if str(p.get("name") or "").strip().lower() == ref.strip().lower()
@@ -843,9 +923,11 @@ def policies_show(
             if ctx.obj.get("json"):
                 print(c.pretty_json({"ref": ref, "matches": items}))
                 return
-            console = _console()
+            console = _console(ctx)
             console.print(f"Ambiguous policy reference: {ref}")
             if items:
+                from baseliner_admin.render import render_policies_list
+
                 render_policies_list(console, search)
             else:
                 console.print("No policies matched.")
@@ -855,7 +937,9 @@ def policies_show(
     if ctx.obj.get("json"):
         print(c.pretty_json(payload))
         return
-    render_policy_detail(_console(), payload, raw=raw)
+    from baseliner_admin.render import render_policy_detail
+
+    render_policy_detail(_console(ctx), payload, raw=raw)
 
 
 @policies_app.command("upsert")
@@ -915,7 +999,7 @@ def policies_upsert(
     if ctx.obj.get("json"):
         print(c.pretty_json(resp))
         return
-    _console().print_json(data=resp)
+    _console(ctx).print_json(data=resp)
 
 
 @assignments_app.command("list")
@@ -927,10 +1011,9 @@ def assignments_list(
     include_deleted: bool = typer.Option(True, "--include-deleted/--active-only"),
 ) -> None:
     c = _client(ctx)
-    console = _console()
     device_id = _resolve_device_id(
         client=c,
-        console=console,
+        ctx=ctx,
         device_ref=device,
         include_deleted=include_deleted,
     )
@@ -940,7 +1023,9 @@ def assignments_list(
         print(c.pretty_json(payload))
         return
 
-    render_assignments_list(console, payload)
+    from baseliner_admin.render import render_assignments_list
+
+    render_assignments_list(_console(ctx), payload)
 
 
 @assignments_app.command("set")
@@ -956,20 +1041,19 @@ def assignments_set(
     include_inactive_policies: bool = typer.Option(True, "--include-inactive-policies/--active-only"),
 ) -> None:
     c = _client(ctx)
-    console = _console()
 
     mode_n = _normalize_mode(mode)
     assert mode_n is not None
 
     device_id = _resolve_device_id(
         client=c,
-        console=console,
+        ctx=ctx,
         device_ref=device,
         include_deleted=include_deleted,
     )
     policy_name = _resolve_policy_name(
         client=c,
-        console=console,
+        ctx=ctx,
         policy_ref=policy,
         include_inactive=include_inactive_policies,
     )
@@ -985,7 +1069,96 @@ def assignments_set(
         print(c.pretty_json(payload))
         return
 
-    console.print_json(data=payload)
+    _console(ctx).print_json(data=payload)
+
+
+def _load_set_many_file(path: Path) -> list[dict[str, Any]]:
+    """Load `device,policy[,mode[,priority]]` lines (blank lines and # comments skipped)."""
+
+    rows: list[dict[str, Any]] = []
+    with path.open(newline="", encoding="utf-8-sig") as f:
+        for lineno, fields in enumerate(csv.reader(f), start=1):
+            fields = [x.strip() for x in fields]
+            if not fields or not fields[0] or fields[0].startswith("#"):
+                continue
+            if len(fields) < 2 or not fields[1]:
+                raise typer.BadParameter(f"Line {lineno}: expected device,policy[,mode[,priority]]")
+
+            mode_raw = fields[2] if len(fields) > 2 else None
+            try:
+                mode = _normalize_mode(mode_raw) or "enforce"
+            except typer.BadParameter:
+                raise typer.BadParameter(
+                    f"Line {lineno}: invalid mode: {mode_raw} (expected enforce or audit)"
+                )
+            prio_raw = fields[3] if len(fields) > 3 and fields[3] else "9999"
+            try:
+                priority = int(prio_raw)
+            except ValueError:
+                raise typer.BadParameter(f"Line {lineno}: invalid priority: {prio_raw}")
+
+            rows.append(
+                {"device": fields[0], "policy": fields[1], "mode": mode, "priority": priority}
+            )
+    return rows
+
+
+@assignments_app.command("set-many")
+def assignments_set_many(
+    ctx: typer.Context,
+    file: Path = typer.Argument(
+        ..., exists=True, dir_okay=False, readable=True, help="CSV: device,policy[,mode[,priority]]"
+    ),
+    include_deleted: bool = typer.Option(True, "--include-deleted/--active-only"),
+    include_inactive_policies: bool = typer.Option(
+        True, "--include-inactive-policies/--active-policies-only"
+    ),
+) -> None:
+    """Set many assignments from a CSV file in one run.
+
+    Each distinct device/policy reference is resolved once, then every assignment is
+    posted over the same connection.
+    """
+
+    c = _client(ctx)
+    rows = _load_set_many_file(file)
+
+    device_ids: dict[str, str] = {}
+    policy_names: dict[str, str] = {}
+    for r in rows:
+        if r["device"] not in device_ids:
+            device_ids[r["device"]] = _resolve_device_id(
+                client=c,
+                ctx=ctx,
+                device_ref=r["device"],
+                include_deleted=include_deleted,
+            )
+        if r["policy"] not in policy_names:
+            policy_names[r["policy"]] = _resolve_policy_name(
+                client=c,
+                ctx=ctx,
+                policy_ref=r["policy"],
+                include_inactive=include_inactive_policies,
+            )
+
+    results: list[Any] = []
+    for r in rows:
+        results.append(
+            c.assignment_set(
+                device_id=device_ids[r["device"]],
+                policy_name=policy_names[r["policy"]],
+                priority=int(r["priority"]),
+                mode=str(r["mode"]),
+            )
+        )
+
+    if ctx.obj.get("json"):
+        print(c.pretty_json({"ok": True, "count": len(results), "results": results}))
+        return
+
+    _console(ctx).print(
+        f"[green]OK[/green] set {len(results)} assignments on {len(device_ids)} devices"
+    )
 
 
 @assignments_app.command("update")
@@ -1007,23 +1180,22 @@ def assignments_update(
     """
 
     c = _client(ctx)
-    console = _console()
 
     device_id = _resolve_device_id(
         client=c,
-        console=console,
+        ctx=ctx,
         device_ref=device,
         include_deleted=include_deleted,
     )
     policy_name = _resolve_policy_name(
         client=c,
-        console=console,
+        ctx=ctx,
         policy_ref=policy,
         include_inactive=include_inactive_policies,
     )
 
     current = c.device_assignments_list(device_id)
-    assignments = list(current.get("assignments") or [])
+    assignments = list_field(current, "assignments")
     match = None
     for a in assignments:
         if str(a.get("policy_name") or "").strip().lower() == policy_name.strip().lower():
@@ -1031,7 +1203,7 @@ def assignments_update(
             break
 
     if not match:
-        console.print(f"No existing assignment found for policy: {policy_name}")
+        _console(ctx).print(f"No existing assignment found for policy: {policy_name}")
         raise typer.Exit(code=1)
 
     current_mode = _normalize_mode(str(match.get("mode") or "enforce")) or "enforce"
@@ -1049,7 +1221,7 @@ def assignments_update(
         print(c.pretty_json(payload))
         return
 
-    console.print_json(data=payload)
+    _console(ctx).print_json(data=payload)
 
 
 @assignments_app.command("apply")
@@ -1071,20 +1243,23 @@ def assignments_apply(
     yes: bool = typer.Option(False, "--yes", help="Do not prompt for confirmation"),
 ) -> None:
     c = _client(ctx)
-    console = _console()
 
     device_id = _resolve_device_id(
-        client=c, console=console, device_ref=device_ref, include_deleted=True
+        client=c, ctx=ctx, device_ref=device_ref, include_deleted=True
     )
 
     specs = _load_assignments_file(file)
+    # One policies_list call resolves every id/name ref in the file; only substring refs (or
+    # policies beyond the first 500) fall back to a per-ref lookup.
+    needs_lookup = any(not (s.get("policy_id") and s.get("policy_name")) for s in specs)
+    resolved = _policy_index(c) if needs_lookup else {}
     desired = [
-        _normalize_assignment_spec(client=c, console=console, spec=s)
+        _normalize_assignment_spec(client=c, ctx=ctx, spec=s, resolved=resolved)
         for s in specs
     ]
 
     current_payload = c.device_assignments_list(device_id)
-    current = list(current_payload.get("assignments") or [])
+    current = list_field(current_payload, "assignments")
 
     if clear_first:
         rows = [
@@ -1122,11 +1297,14 @@ def assignments_apply(
             return
 
     if not ctx.obj.get("json"):
+        console = _console(ctx)
         console.print(f"Device: {device_id}")
         if clear_first:
             console.print(
                 f"[yellow]Will clear[/yellow] {len(current)} existing assignments, then set {len(desired)} from file."
             )
+        from baseliner_admin.render import render_assignments_plan
+
         render_assignments_plan(console, rows, device_id=device_id)
         console.print(
             f"add={counts['add']} update={counts['update']} remove={counts['remove']} keep={counts['keep']}"
@@ -1180,7 +1358,7 @@ def assignments_apply(
         )
         return
 
-    console.print("[green]OK[/green]")
+    _console(ctx).print("[green]OK[/green]")
 
 
 @assignments_app.command("remove")
@@ -1199,20 +1377,19 @@ def assignments_remove(
     """Remove a single policy assignment from a device."""
 
     c = _client(ctx)
-    console = _console()
 
     device_id = _resolve_device_id(
         client=c,
-        console=console,
+        ctx=ctx,
         device_ref=device,
         include_deleted=include_deleted,
     )
 
     current = c.device_assignments_list(device_id)
-    assignments = list(current.get("assignments") or [])
+    assignments = list_field(current, "assignments")
 
     policy_id, policy_name = _resolve_assignment_policy(
-        console=console,
+        ctx=ctx,
         policy_ref=policy,
         assignments=assignments,
     )
@@ -1230,7 +1407,7 @@ def assignments_remove(
         print(c.pretty_json(payload))
         return
 
-    console.print_json(data=payload)
+    _console(ctx).print_json(data=payload)
 
 
 @assignments_app.command("clone")
@@ -1262,19 +1439,17 @@ def assignments_clone(
     In merge mode, this command is drift-aware: it only calls the server for
     assignments that would change (add/update), and shows a plan with actions.
     """
-
     c = _client(ctx)
-    console = _console()
 
     src_id = _resolve_device_id(
         client=c,
-        console=console,
+        ctx=ctx,
         device_ref=source_device,
         include_deleted=include_deleted,
     )
     dst_id = _resolve_device_id(
         client=c,
-        console=console,
+        ctx=ctx,
         device_ref=dest_device,
         include_deleted=include_deleted,
     )
@@ -1284,10 +1459,10 @@ def assignments_clone(
     mode_override = _normalize_mode(mode)
 
     src_payload = c.device_assignments_list(src_id)
-    src_items = list(src_payload.get("assignments") or [])
+    src_items = list_field(src_payload, "assignments")
 
     if not src_items:
-        console.print(f"Source device {src_id} has no assignments.")
+        _console(ctx).print(f"Source device {src_id} has no assignments.")
         raise typer.Exit(code=1)
 
     desired: list[dict[str, Any]] = []
@@ -1314,7 +1489,7 @@ def assignments_clone(
         )
 
     current_payload = c.device_assignments_list(dst_id)
-    current = list(current_payload.get("assignments") or [])
+    current = list_field(current_payload, "assignments")
 
     if clear_first:
         rows = [
@@ -1354,6 +1529,7 @@ def assignments_clone(
             return
 
     if not ctx.obj.get("json"):
+        console = _console(ctx)
         console.print("[bold]Clone plan[/bold]")
         console.print(f"source={src_id}")
         console.print(f"dest={dst_id}")
@@ -1361,6 +1537,8 @@ def assignments_clone(
             console.print(
                 f"[yellow]Will clear[/yellow] {len(current)} existing assignments, then set {len(desired)} from source."
             )
+        from baseliner_admin.render import render_assignments_plan
+
         render_assignments_plan(console, rows, device_id=dst_id)
         console.print(
             f"add={counts['add']} update={counts['update']} remove={counts['remove']} keep={counts['keep']}"
@@ -1371,7 +1549,7 @@ def assignments_clone(
 
     # No-op fast path.
     if not clear_first and (counts.get("add", 0) + counts.get("update", 0)) == 0:
-        console.print("No changes needed.")
+        _console(ctx).print("No changes needed.")
         return
 
     if not yes:
@@ -1402,7 +1580,7 @@ def assignments_clone(
                 mode=str(r.get("mode") or "enforce"),
             )
 
-    console.print(f"Applied assignments to {dst_id}.")
+    _console(ctx).print(f"Applied assignments to {dst_id}.")
 
 
 
@@ -1416,10 +1594,9 @@ def assignments_clear(
     yes: bool = typer.Option(False, "--yes", help="Skip confirmation prompt"),
 ) -> None:
     c = _client(ctx)
-    console = _console()
     device_id = _resolve_device_id(
         client=c,
-        console=console,
+        ctx=ctx,
         device_ref=device,
         include_deleted=include_deleted,
     )
@@ -1434,7 +1611,69 @@ def assignments_clear(
         print(c.pretty_json(payload))
         return
 
-    console.print_json(data=payload)
+    _console(ctx).print_json(data=payload)
+
+
+def _iter_audit_pages(
+    client: BaselinerAdminClient,
+    *,
+    cursor: str | None,
+    pages: int,
+    **filters: Any,
+) -> Iterator[dict[str, Any]]:
+    """Yield audit pages, following next_cursor (pages <= 0 means until exhausted)."""
+
+    fetched = 0
+    while True:
+        payload = client.audit_list(cursor=cursor, **filters)
+        yield payload
+        fetched += 1
+        cursor = payload.get("next_cursor")
+        if not cursor or (pages > 0 and fetched >= pages):
+            return
+
+
+@audit_app.command("list")
+def audit_list(
+    ctx: typer.Context,
+    limit: int = typer.Option(100, "--limit", help="Events per page"),
+    cursor: str | None = typer.Option(None, "--cursor", help="Resume from a next_cursor"),
+    pages: int = typer.Option(1, "--pages", help="Pages to fetch (0 = all)"),
+    action: str | None = typer.Option(None, "--action"),
+    target_type: str | None = typer.Option(None, "--target-type"),
+    target_id: str | None = typer.Option(None, "--target-id"),
+) -> None:
+    """List audit events, newest first, following cursors across pages."""
+    c = _client(ctx)
+    page_iter = _iter_audit_pages(
+        c,
+        cursor=cursor,
+        pages=int(pages),
+        limit=limit,
+        action=action,
+        target_type=target_type,
+        target_id=target_id,
+    )
+
+    if ctx.obj.get("json"):
+        items: list[dict[str, Any]] = []
+        next_cursor = None
+        for page in page_iter:
+            items.extend(list_field(page, "items"))
+            next_cursor = page.get("next_cursor")
+        print(c.pretty_json({"items": items, "limit": limit, "next_cursor": next_cursor}))
+        return
+
+    # Render each page as it arrives rather than waiting for the whole walk.
+    from baseliner_admin.render import render_audit_list
+
+    console = _console(ctx)
+    next_cursor = None
+    for page in page_iter:
+        render_audit_list(console, page)
+        next_cursor = page.get("next_cursor")
+    if next_cursor:
+        console.print(f"next_cursor={next_cursor}")
 
 
 # ---------------------------------------------------------------------------
@@ -1445,12 +1684,13 @@ def assignments_clear(
 @tenants_app.command("list")
 def tenants_list(ctx: typer.Context) -> None:
     c = _client(ctx)
-    console = _console()
     payload = c.tenants_list()
     if ctx.obj.get("json"):
         print(c.pretty_json(payload))
         return
-    render_tenants_list(console, payload)
+    from baseliner_admin.render import render_tenants_list
+
+    render_tenants_list(_console(ctx), payload)
 
 
 @tenants_app.command("create")
@@ -1460,12 +1700,11 @@ def tenants_create(
     active: bool = typer.Option(True, "--active/--inactive", help="Whether the tenant is active"),
 ) -> None:
     c = _client(ctx)
-    console = _console()
     payload = c.tenants_create(name=name, is_active=active)
     if ctx.obj.get("json"):
         print(c.pretty_json(payload))
         return
-    console.print_json(data=payload)
+    _console(ctx).print_json(data=payload)
 
 @tenants_app.command("update")
 def tenants_update(
@@ -1480,7 +1719,6 @@ def tenants_update(
 ) -> None:
     """Update a tenant (superadmin-only)."""
     client = _client(ctx)
-    console = _console()
 
     payload: dict[str, object] = {}
     if name is not None:
@@ -1489,21 +1727,21 @@ def tenants_update(
         payload["is_active"] = is_active
 
     if not payload:
-        console.print("[yellow]Nothing to update.[/yellow] (use --name and/or --active/--inactive)")
+        _console(ctx).print("[yellow]Nothing to update.[/yellow] (use --name and/or --active/--inactive)")
         raise typer.Exit(code=0)
 
     try:
         resp = client.tenants_update(tenant_id=tenant_id, name=name, is_active=is_active)
     except Exception as e:
-        console.print(f"[red]Error:[/red] {e}")
+        _console(ctx).print(f"[red]Error:[/red] {e}")
         raise typer.Exit(code=1)
 
     if (ctx.obj or {}).get("json"):
-        console.print(BaselinerAdminClient.pretty_json(resp))
+        print(BaselinerAdminClient.pretty_json(resp))
         return
 
     tenant = (resp or {}).get("tenant") or {}
-    console.print(f"Updated tenant {tenant.get('id')}: name={tenant.get('name')} active={tenant.get('is_active')}")
+    _console(ctx).print(f"Updated tenant {tenant.get('id')}: name={tenant.get('name')} active={tenant.get('is_active')}")
 
 
 @tenants_app.command("keys-issue")
@@ -1514,13 +1752,13 @@ def tenants_keys_issue(
     note: str | None = typer.Option(None, "--note", help="Optional note"),
 ) -> None:
     c = _client(ctx)
-    console = _console()
     payload = c.admin_keys_issue(tenant_id=tenant_id, scope=scope, note=note)
     if ctx.obj.get("json"):
         print(c.pretty_json(payload))
         return
 
     # Highlight the one-time raw key.
+    console = _console(ctx)
     raw_key = payload.get("admin_key")
     console.print(f"[bold]ADMIN KEY (one-time):[/bold] {raw_key}")
     console.print_json(data={k: v for (k, v) in payload.items() if k != "admin_key"})
@@ -1532,12 +1770,13 @@ def tenants_keys_list(
     tenant_id: str = typer.Argument(..., help="Tenant UUID"),
 ) -> None:
     c = _client(ctx)
-    console = _console()
     payload = c.admin_keys_list(tenant_id=tenant_id)
     if ctx.obj.get("json"):
         print(c.pretty_json(payload))
         return
-    render_admin_keys_list(console, payload)
+    from baseliner_admin.render import render_admin_keys_list
+
+    render_admin_keys_list(_console(ctx), payload)
 
 
 @tenants_app.command("keys-revoke")
@@ -1548,7 +1787,6 @@ def tenants_keys_revoke(
     yes: bool = typer.Option(False, "--yes", help="Skip confirmation prompt"),
 ) -> None:
     c = _client(ctx)
-    console = _console()
 
     if not yes:
         if not typer.confirm(f"Revoke admin key {key_id} for tenant {tenant_id}?", default=False):
@@ -1558,11 +1796,67 @@ def tenants_keys_revoke(
     if ctx.obj.get("json"):
         print("{}")
         return
-    console.print("ok")
+    _console(ctx).print("ok")
+
+
+def _api_error_message(e: ApiError) -> str:
+    from rich.markup import escape
+
+    detail = e.detail
+    if isinstance(detail, dict) and "detail" in detail:
+        detail = detail["detail"]
+    if not isinstance(detail, str):
+        detail = BaselinerAdminClient.pretty_json(detail)
+    return f"[red]Request failed[/red] (HTTP {e.status_code}): {escape(detail)}"
+
+
+# Global options that take a separate value token (`--server URL`), skipped when sniffing argv.
+_VALUE_OPTIONS = frozenset({"--server", "--admin-key", "--tenant-id"})
+
+
+def _sniff_subcommand(argv: list[str]) -> str | None:
+    """Return the first bare word in argv (the subcommand name), if any."""
+    it = iter(argv)
+    for tok in it:
+        if tok in _VALUE_OPTIONS:
+            next(it, None)
+            continue
+        if tok.startswith("-"):
+            continue
+        return tok
+    return None
+
+
+def _app_for_argv(argv: list[str]) -> typer.Typer:
+    """Trim `app` to the one group being invoked.
+
+    Typer builds a Click command for every registered command on each run, so for
+    `devices list` only the devices group is kept and for `whoami` no group at all. Bare
+    `--help` and unknown names get the full app so help and "no such command" stay complete.
+    """
+    name = _sniff_subcommand(argv)
+    top_level = {
+        c.name or c.callback.__name__.replace("_", "-")
+        for c in app.registered_commands
+        if c.callback is not None
+    }
+    groups = [g for g in app.registered_groups if g.name == name]
+    if not groups and name not in top_level:
+        return app
+    trimmed = copy.copy(app)
+    trimmed.registered_groups = groups
+    return trimmed
 
 
 def main() -> None:
-    app()
+    # API errors are reported once here instead of in every command, and without a traceback.
+    try:
+        _app_for_argv(sys.argv[1:])()
+    except ApiError as e:
+        from rich.console import Console
+
+        Console(stderr=True).print(_api_error_message(e))
+        raise SystemExit(1)
 
 
 if __name__ == "__main__":
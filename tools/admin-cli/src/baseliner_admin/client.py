@@ -2,9 +2,10 @@ from __future__ import annotations
 
 import json
 from dataclasses import dataclass
-from typing import Any, Mapping
+from typing import TYPE_CHECKING, Any, Mapping
 
-import httpx
+if TYPE_CHECKING:  # pragma: no cover
+    import httpx
 
 
 DEFAULT_TENANT_ID = "00000000-0000-0000-0000-000000000001"
@@ -52,8 +53,12 @@ class BaselinerAdminClient:
         if not cfg.tenant_id:
             raise ValueError("tenant_id is required")
 
+        # httpx is the single largest import in the CLI; load it only once a client is
+        # actually built so `--help` and argument errors stay fast.
+        import httpx
+
         self.cfg = cfg
-        self._client = httpx.Client(
+        self._client: httpx.Client = httpx.Client(
             base_url=server,
             timeout=cfg.timeout_s,
             headers={
@@ -93,7 +98,20 @@ class BaselinerAdminClient:
 
     @staticmethod
     def pretty_json(obj: Any) -> str:
-        return json.dumps(obj, indent=2, sort_keys=True, default=str)
+        # json.dumps falls back to its pure-Python encoder whenever indent is set, which dominates
+        # `--json` on large payloads (runs show --logs-all); orjson, when installed, renders the
+        # same indented, key-sorted output in a fraction of the time.
+        try:
+            import orjson
+        except ImportError:
+            return json.dumps(obj, indent=2, sort_keys=True, default=str)
+        try:
+            return orjson.dumps(
+                obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS, default=str
+            ).decode()
+        except TypeError:
+            # e.g. non-str dict keys, which json.dumps coerces and orjson rejects.
+            return json.dumps(obj, indent=2, sort_keys=True, default=str)
 
     
     def whoami(self) -> Any:
@@ -103,17 +121,21 @@ class BaselinerAdminClient:
     # ---- Admin helpers ----
 
     def devices_list(
-        self, *, limit: int = 50, offset: int = 0, include_deleted: bool = False
+        self,
+        *,
+        limit: int = 50,
+        offset: int = 0,
+        include_deleted: bool = False,
+        q: str | None = None,
     ) -> Any:
-        return self.request(
-            "GET",
-            "/api/v1/admin/devices",
-            params={
-                "limit": int(limit),
-                "offset": int(offset),
-                "include_deleted": str(bool(include_deleted)).lower(),
-            },
-        )
+        params: dict[str, Any] = {
+            "limit": int(limit),
+            "offset": int(offset),
+            "include_deleted": str(bool(include_deleted)).lower(),
+        }
+        if q:
+            params["q"] = q
+        return self.request("GET", "/api/v1/admin/devices", params=params)
 
     def devices_debug(self, device_id: str) -> Any:
         return self.request("GET", f"/api/v1/admin/devices/{device_id}/debug")
@@ -3,7 +3,7 @@ from __future__ import annotations
 import json
 from typing import Any
 
-from rich.console import Console
+from rich.console import Console, Group
 from rich.table import Table
 
 
@@ -70,12 +70,11 @@ def render_policy_detail(
         "updated_at",
     ):
         meta.add_row(k, str(policy.get(k)))
-    console.print(meta)
 
     doc = policy.get("document") or {}
     resources = doc.get("resources") if isinstance(doc, dict) else None
     if not isinstance(resources, list) or not resources:
-        console.print("(no resources)")
+        console.print(Group(meta, "(no resources)"))
         return
 
     t = Table(title="Resources")
@@ -103,7 +102,7 @@ def render_policy_detail(
 
         t.add_row(str(idx), r_type, rid, name, _trunc(details, 120))
 
-    console.print(t)
+    console.print(Group(meta, t))
 
     if show_scripts:
         for idx, r in enumerate(resources, start=1):
@@ -324,9 +323,9 @@ def render_run_detail(
         "agent_version",
     ):
         meta.add_row(k, str(payload.get(k)))
-    console.print(meta)
 
     if not full:
+        console.print(meta)
         return
 
     items = payload.get("items") or []
@@ -357,7 +356,6 @@ def render_run_detail(
             str(it.get("status_validate") or ""),
             _trunc(str(err_type or ""), 40),
         )
-    console.print(t_items)
 
     t_logs = Table(title=f"Logs (showing up to {logs_limit})")
     t_logs.add_column("ts", overflow="fold")
@@ -372,7 +370,9 @@ def render_run_detail(
             _trunc(str(lg.get("message") or ""), 160),
             str(lg.get("run_item_id") or ""),
         )
-    console.print(t_logs)
+
+    # One print for all three tables, so rich lays out and writes the detail view in one pass.
+    console.print(Group(meta, t_items, t_logs))
 
 
 def render_tenants_list(console: Console, payload: dict[str, Any], *, title: str = "Tenants") -> None:
@@ -413,3 +413,28 @@ def render_admin_keys_list(
             _trunc(str(it.get("note") or ""), 80),
         )
     console.print(t)
+
+
+def render_audit_list(
+    console: Console, payload: dict[str, Any], *, title: str = "Audit log"
+) -> None:
+    items = payload.get("items") or []
+    t = Table(title=title)
+    t.add_column("ts", overflow="fold")
+    t.add_column("actor")
+    t.add_column("action")
+    t.add_column("target", overflow="fold")
+    t.add_column("correlation_id", overflow="fold")
+
+    for ev in items:
+        target = str(ev.get("target_type") or "")
+        if ev.get("target_id"):
+            target = f"{target}:{ev.get('target_id')}"
+        t.add_row(
+            str(ev.get("ts") or ""),
+            str(ev.get("actor_type") or ""),
+            str(ev.get("action") or ""),
+            target,
+            str(ev.get("correlation_id") or ""),
+        )
+    console.print(t)
@@ -19,7 +19,7 @@ from baseliner_admin.render import (
     render_run_detail,
     render_runs_list,
 )
-from baseliner_admin.util import read_json_file, try_parse_uuid
+from baseliner_admin.util import list_field, read_json_file, try_parse_uuid
 
 
 @dataclass(frozen=True)
@@ -114,10 +114,15 @@ def _resolve_device(
     include_deleted: bool = True,
 ) -> dict[str, Any] | None:
     device_ref = device_ref.strip()
-    payload = client.devices_list(limit=500, offset=0, include_deleted=include_deleted)
-    items = list(payload.get("items") or [])
-
     parsed = try_parse_uuid(device_ref)
+    payload = client.devices_list(
+        limit=500,
+        offset=0,
+        include_deleted=include_deleted,
+        q=None if parsed else device_ref,
+    )
+    items = list_field(payload, "items")
+
     if parsed:
         matches = [d for d in items if str(d.get("id")) == str(parsed)]
     else:
@@ -14,5 +14,18 @@ def try_parse_uuid(value: str) -> uuid.UUID | None:
 
 
 def read_json_file(path: Path) -> Any:
-    data = path.read_text(encoding="utf-8")
-    return json.loads(data)
+    # json.loads decodes bytes itself (UTF-8/16/32, with or without a BOM), which skips an
+    # intermediate str and accepts BOM-prefixed files written by Windows tooling.
+    return json.loads(path.read_bytes())
+
+
+def list_field(payload: Any, key: str = "items") -> list[Any]:
+    """Return payload[key] if it is a list, or [] if the response does not have that shape.
+
+    The list is returned as-is (not copied); callers only read it.
+    """
+    try:
+        value = payload[key]
+    except (TypeError, KeyError):
+        return []
+    return value if isinstance(value, list) else []
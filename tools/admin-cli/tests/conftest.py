@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import io
+import sys
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+import typer
+import typer.main
+from typer.testing import CliRunner
+
+# Import the in-repo package without requiring an editable install.
+_SRC = Path(__file__).resolve().parents[1] / "src"
+if str(_SRC) not in sys.path:
+    sys.path.insert(0, str(_SRC))
+
+from baseliner_admin import cli  # noqa: E402
+
+
+@pytest.fixture()
+def cli_ctx() -> typer.Context:
+    """A Context like the one main_callback builds, with a console that records into a buffer."""
+    from rich.console import Console
+
+    console = Console(file=io.StringIO(), width=200, no_color=True)
+    return typer.Context(typer.main.get_command(cli.app), obj={"json": False, "console": console})
+
+
+@pytest.fixture()
+def invoke(monkeypatch) -> Callable[..., Any]:
+    """Run the CLI in-process with `client` standing in for BaselinerAdminClient."""
+
+    def _invoke(client: Any, *args: str, input: str | None = None):
+        monkeypatch.setattr(cli, "_client", lambda ctx: client)
+        return CliRunner().invoke(
+            cli.app,
+            ["--server", "http://baseliner.test", "--admin-key", "k", *args],
+            input=input,
+        )
+
+    return _invoke
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import pytest
+import typer.main
+from baseliner_admin import cli
+
+ALL_GROUPS = sorted(g.name for g in cli.app.registered_groups)
+
+
+@pytest.mark.parametrize(
+    ("argv", "expected_groups"),
+    [
+        ([], ALL_GROUPS),
+        (["--help"], ALL_GROUPS),
+        (["devices", "--help"], ["devices"]),
+        (["--server", "http://x", "runs", "list"], ["runs"]),
+        (["--server=http://x", "policies", "list"], ["policies"]),
+        # A global option's value that happens to be a group name is not the subcommand.
+        (["--tenant-id", "devices", "audit", "list"], ["audit"]),
+        (["--json", "--admin-key", "k", "assignments", "apply", "d", "f.json"], ["assignments"]),
+        (["--json", "whoami"], []),
+        (["tui"], []),
+        (["bogus"], ALL_GROUPS),
+    ],
+)
+def test_app_for_argv_keeps_only_the_invoked_group(argv, expected_groups):
+    trimmed = cli._app_for_argv(argv)
+
+    assert sorted(g.name for g in trimmed.registered_groups) == expected_groups
+    # Top-level commands are always kept, and the module-level app is never modified.
+    assert trimmed.registered_commands == cli.app.registered_commands
+    assert sorted(g.name for g in cli.app.registered_groups) == ALL_GROUPS
+
+
+def test_value_options_cover_every_global_option_that_takes_a_value():
+    # A new global `--foo VALUE` missing from _VALUE_OPTIONS would make its value look like
+    # the subcommand name.
+    root = typer.main.get_command(cli.app)
+    value_opts = {
+        opt
+        for p in root.params
+        if getattr(p, "opts", None) and not getattr(p, "is_flag", False)
+        for opt in p.opts
+        if opt.startswith("--")
+    }
+    assert value_opts - {"--help"} == set(cli._VALUE_OPTIONS)
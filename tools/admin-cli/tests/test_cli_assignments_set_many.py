@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import json
+from collections import Counter
+from typing import Any
+
+import pytest
+import typer
+from baseliner_admin import cli
+from baseliner_admin.client import BaselinerAdminClient
+
+DEVICES = {
+    "web-01": "11111111-1111-1111-1111-111111111111",
+    "db-01": "22222222-2222-2222-2222-222222222222",
+}
+POLICIES = ["baseline", "hardening"]
+
+
+class StubClient:
+    """Just enough of BaselinerAdminClient for `assignments set-many`; records every call."""
+
+    pretty_json = staticmethod(BaselinerAdminClient.pretty_json)
+
+    def __init__(self) -> None:
+        self.calls: Counter[tuple[str, str]] = Counter()
+        self.assigned: list[dict[str, Any]] = []
+
+    def devices_list(self, *, q: str | None = None, **_: Any) -> dict[str, Any]:
+        self.calls["devices_list", q or ""] += 1
+        items = [
+            {"id": did, "device_key": key, "hostname": key}
+            for key, did in DEVICES.items()
+            if q and q.lower() in key
+        ]
+        return {"items": items}
+
+    def policies_list(self, *, q: str | None = None, **_: Any) -> dict[str, Any]:
+        self.calls["policies_list", q or ""] += 1
+        return {"items": [{"id": f"pol-{n}", "name": n} for n in POLICIES if q and q in n]}
+
+    def assignment_set(self, **kwargs: Any) -> dict[str, Any]:
+        self.assigned.append(kwargs)
+        return {"ok": True}
+
+
+def _write(tmp_path, text: str):
+    path = tmp_path / "assignments.csv"
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_load_set_many_file_skips_comments_and_applies_defaults(tmp_path):
+    path = _write(
+        tmp_path,
+        "# device,policy,mode,priority\n"
+        "\n"
+        "web-01,baseline\n"
+        "db-01, hardening , audit, 5\n"
+        "db-01,baseline,,\n",
+    )
+
+    assert cli._load_set_many_file(path) == [
+        {"device": "web-01", "policy": "baseline", "mode": "enforce", "priority": 9999},
+        {"device": "db-01", "policy": "hardening", "mode": "audit", "priority": 5},
+        {"device": "db-01", "policy": "baseline", "mode": "enforce", "priority": 9999},
+    ]
+
+
+@pytest.mark.parametrize(
+    ("text", "message"),
+    [
+        ("web-01,baseline\n# skipped\nweb-01,baseline,enforce,high\n", "Line 3: invalid priority: high"),
+        ("web-01,baseline,bogus\n", "Line 1: invalid mode: bogus"),
+        ("web-01\n", "Line 1: expected device,policy"),
+    ],
+)
+def test_load_set_many_file_errors_name_the_line(tmp_path, text, message):
+    with pytest.raises(typer.BadParameter, match=message):
+        cli._load_set_many_file(_write(tmp_path, text))
+
+
+def test_set_many_resolves_each_ref_once(tmp_path, invoke):
+    path = _write(
+        tmp_path,
+        "web,baseline\n"
+        "web,hardening,audit,10\n"
+        "db,baseline\n"
+        "db,hardening\n",
+    )
+    client = StubClient()
+
+    result = invoke(client, "--json", "assignments", "set-many", str(path))
+
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output)["count"] == 4
+    assert client.calls == Counter(
+        {
+            ("devices_list", "web"): 1,
+            ("devices_list", "db"): 1,
+            ("policies_list", "baseline"): 1,
+            ("policies_list", "hardening"): 1,
+        }
+    )
+    assert [(a["device_id"], a["policy_name"], a["mode"], a["priority"]) for a in client.assigned] == [
+        (DEVICES["web-01"], "baseline", "enforce", 9999),
+        (DEVICES["web-01"], "hardening", "audit", 10),
+        (DEVICES["db-01"], "baseline", "enforce", 9999),
+        (DEVICES["db-01"], "hardening", "enforce", 9999),
+    ]
+
+
+def test_set_many_device_and_policy_filters_are_separate_flags(tmp_path, invoke, monkeypatch):
+    seen: dict[str, bool] = {}
+
+    def _device(*, include_deleted: bool, **_: Any) -> str:
+        seen["include_deleted"] = include_deleted
+        return DEVICES["web-01"]
+
+    def _policy(*, include_inactive: bool, **_: Any) -> str:
+        seen["include_inactive"] = include_inactive
+        return "baseline"
+
+    monkeypatch.setattr(cli, "_resolve_device_id", _device)
+    monkeypatch.setattr(cli, "_resolve_policy_name", _policy)
+    path = _write(tmp_path, "web,baseline\n")
+
+    result = invoke(StubClient(), "--json", "assignments", "set-many", str(path), "--active-policies-only")
+    assert result.exit_code == 0, result.output
+    assert seen == {"include_deleted": True, "include_inactive": False}
+
+    result = invoke(StubClient(), "--json", "assignments", "set-many", str(path), "--active-only")
+    assert result.exit_code == 0, result.output
+    assert seen == {"include_deleted": False, "include_inactive": True}
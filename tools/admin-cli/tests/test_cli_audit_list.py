@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+import pytest
+from baseliner_admin import cli
+from baseliner_admin.client import BaselinerAdminClient
+
+
+class StubAudit:
+    """audit_list stub serving two pages keyed by cursor; the second ends with next_cursor=None."""
+
+    pretty_json = staticmethod(BaselinerAdminClient.pretty_json)
+
+    PAGES: dict[str | None, dict[str, Any]] = {
+        None: {"items": [{"id": 3}, {"id": 2}], "next_cursor": "c1"},
+        "c1": {"items": [{"id": 1}], "next_cursor": None},
+    }
+
+    def __init__(self) -> None:
+        self.calls: list[dict[str, Any]] = []
+
+    def audit_list(self, **kwargs: Any) -> dict[str, Any]:
+        self.calls.append(kwargs)
+        return self.PAGES[kwargs["cursor"]]
+
+
+def test_iter_audit_pages_follows_cursors_until_exhausted():
+    client = StubAudit()
+
+    pages = list(cli._iter_audit_pages(client, cursor=None, pages=0, limit=2, action="x"))
+
+    assert pages == [StubAudit.PAGES[None], StubAudit.PAGES["c1"]]
+    assert client.calls == [
+        {"cursor": None, "limit": 2, "action": "x"},
+        {"cursor": "c1", "limit": 2, "action": "x"},
+    ]
+
+
+def test_audit_list_json_concatenates_pages_in_order(invoke):
+    client = StubAudit()
+
+    result = invoke(client, "--json", "audit", "list", "--limit", "2", "--pages", "0")
+
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output) == {
+        "items": [{"id": 3}, {"id": 2}, {"id": 1}],
+        "limit": 2,
+        "next_cursor": None,
+    }
+    assert [c["limit"] for c in client.calls] == [2, 2]
+
+
+@pytest.mark.parametrize("args", [[], ["--pages", "1"]])
+def test_audit_list_page_cap_stops_paging_early(invoke, args):
+    client = StubAudit()
+
+    result = invoke(client, "--json", "audit", "list", "--limit", "2", *args)
+
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output) == {
+        "items": [{"id": 3}, {"id": 2}],
+        "limit": 2,
+        "next_cursor": "c1",
+    }
+    assert [c["cursor"] for c in client.calls] == [None]
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+DEVICE_ID = "11111111-1111-1111-1111-111111111111"
+
+# Runs one CLI invocation in a fresh interpreter (so nothing imported by other tests leaks in),
+# with the HTTP layer replaced by a canned payload, and reports which modules got loaded.
+_SCRIPT = """
+import json, sys
+from typer.testing import CliRunner
+from baseliner_admin import cli, client
+
+client.BaselinerAdminClient.request = lambda self, method, path, **kw: {
+    "device_id": sys.argv[1], "assignments": []
+}
+result = CliRunner().invoke(
+    cli.app,
+    ["--server", "http://x", "--admin-key", "k", *sys.argv[2:]],
+)
+print(json.dumps({
+    "exit_code": result.exit_code,
+    "output": result.output,
+    "rich_console": "rich.console" in sys.modules,
+}))
+"""
+
+
+def _run_cli(*args: str) -> dict:
+    env = dict(os.environ, PYTHONPATH=str(SRC))
+    proc = subprocess.run(
+        [sys.executable, "-c", _SCRIPT, DEVICE_ID, *args],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def test_json_assignments_list_by_uuid_does_not_load_rich():
+    out = _run_cli("--json", "assignments", "list", DEVICE_ID)
+
+    assert out["exit_code"] == 0, out["output"]
+    assert json.loads(out["output"]) == {"device_id": DEVICE_ID, "assignments": []}
+    assert out["rich_console"] is False
+
+
+def test_table_assignments_list_still_renders():
+    out = _run_cli("assignments", "list", DEVICE_ID)
+
+    assert out["exit_code"] == 0, out["output"]
+    assert out["rich_console"] is True
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+import typer
+from baseliner_admin import cli
+
+P_FOO = "11111111-1111-1111-1111-111111111111"
+P_FOO_UPPER = "22222222-2222-2222-2222-222222222222"
+P_BAR = "33333333-3333-3333-3333-333333333333"
+P_EXT = "44444444-4444-4444-4444-444444444444"
+
+
+class StubPolicies:
+    """policies_list stub: the unfiltered page is `page`, `q` searches `all_policies`."""
+
+    def __init__(self, page: list[dict[str, Any]], all_policies: list[dict[str, Any]]) -> None:
+        self.page = page
+        self.all_policies = all_policies
+        self.queries: list[str | None] = []
+
+    def policies_list(self, *, q: str | None = None, **_: Any) -> dict[str, Any]:
+        self.queries.append(q)
+        if q is None:
+            return {"items": self.page}
+        return {"items": [p for p in self.all_policies if q.lower() in p["name"].lower()]}
+
+
+FOO_POLICIES = [
+    {"id": P_FOO, "name": "Foo"},
+    {"id": P_FOO_UPPER, "name": "FOO"},
+    {"id": P_BAR, "name": "Bar"},
+]
+
+
+def test_policy_index_leaves_out_names_shared_case_insensitively():
+    index = cli._policy_index(StubPolicies(FOO_POLICIES, FOO_POLICIES))
+
+    assert "foo" not in index
+    assert index["bar"] == (P_BAR, "Bar")
+    # Ids stay resolvable even when the name is ambiguous.
+    assert index[P_FOO] == (P_FOO, "Foo")
+    assert index[P_FOO_UPPER] == (P_FOO_UPPER, "FOO")
+
+
+def test_ambiguous_name_is_not_resolved_from_the_index(cli_ctx):
+    client = StubPolicies(FOO_POLICIES, FOO_POLICIES)
+    resolved = cli._policy_index(client)
+
+    with pytest.raises(typer.Exit) as exc:
+        cli._normalize_assignment_spec(
+            client=client, ctx=cli_ctx, spec={"policy": "foo"}, resolved=resolved
+        )
+
+    assert exc.value.exit_code == 2
+    # It fell through to the per-ref lookup, which reports the ambiguity.
+    assert client.queries == [None, "foo"]
+
+
+def test_fallback_resolution_is_cached_by_ref_and_id_not_name(cli_ctx):
+    # "Baseline-Extended" is beyond the prefetched page, so it resolves via the fallback.
+    ext = {"id": P_EXT, "name": "Baseline-Extended"}
+    client = StubPolicies(page=[], all_policies=[ext])
+    resolved = cli._policy_index(client)
+
+    spec = cli._normalize_assignment_spec(
+        client=client, ctx=cli_ctx, spec={"policy": "Extended"}, resolved=resolved
+    )
+
+    assert (spec["policy_id"], spec["policy_name"]) == (P_EXT, "Baseline-Extended")
+    assert resolved == {
+        "extended": (P_EXT, "Baseline-Extended"),
+        P_EXT: (P_EXT, "Baseline-Extended"),
+    }
+
+    # The same ref (any case) and the id are served from the cache.
+    for ref in ("extended", P_EXT):
+        again = cli._normalize_assignment_spec(
+            client=client, ctx=cli_ctx, spec={"policy": ref}, resolved=resolved
+        )
+        assert again["policy_id"] == P_EXT
+    assert client.queries == [None, "Extended"]